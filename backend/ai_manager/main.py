@@ -1,72 +1,149 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import func, cast, Float
 from typing import Dict, List, Optional
+from types import MappingProxyType
+from itertools import islice
 import numpy as np
-import pandas as pd
+import uuid
+import time
 from datetime import datetime, timedelta
 
-from ..shared.database.connection import get_db
-from ..shared.models.models import BandwidthUsage, User, Branch, ISP, AIInsight
+from ..shared.database.connection import SessionLocal, get_db
+from ..shared.models.models import BandwidthUsage, User, Branch, AIInsight
 from .schemas import (
     TrafficAnalysisRequest, TrafficAnalysisResponse, 
     QoSOptimizationResponse, NetworkPredictionResponse,
     AnomalyDetectionResponse, OptimizationRecommendation
 )
 from ..auth.dependencies import get_current_user
+from ..shared.utils.cache import cache_get, cache_set
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Seconds an AI analysis result is served from cache before recomputing
+AI_CACHE_TTL = 60
+
+# Hourly traffic buckets as aggregated by the database, one row per hour
+HOURLY_USAGE_DTYPE = np.dtype([
+    ('hour_bucket', 'datetime64[s]'),
+    ('total_bytes', 'f8'),
+    ('samples', 'i8'),
+    ('peak_usage_mbps', 'f8')
+])
+
+# Default per-application shaping policy, shared read-only by every QoS rule set
+TRAFFIC_SHAPING_RULES = MappingProxyType({
+    'video_streaming': 'priority',
+    'gaming': 'low_latency',
+    'file_download': 'background'
+})
+
+# Per-row usage samples fed to the anomaly detector. float32 keeps ~7
+# significant digits, plenty for z-scores, at half the memory traffic
+USAGE_SAMPLE_DTYPE = np.dtype([
+    ('total_bytes', 'f4'),
+    ('peak_usage_mbps', 'f4'),
+    ('created_at', 'datetime64[us]'),
+    ('user_id', 'V16')  # raw UUID bytes
+])
+
+# Rows fetched from the database per round-trip when streaming usage samples
+USAGE_BATCH_SIZE = 8192
+
+def load_usage_samples(query) -> np.ndarray:
+    """Stream (total_bytes, peak_usage_mbps, created_at, user_id) rows into a USAGE_SAMPLE_DTYPE array"""
+    samples = np.empty(USAGE_BATCH_SIZE, dtype=USAGE_SAMPLE_DTYPE)
+    count = 0
+    
+    rows = iter(query.yield_per(USAGE_BATCH_SIZE))
+    while True:
+        batch = list(islice(rows, USAGE_BATCH_SIZE))
+        if not batch:
+            break
+        
+        if count + len(batch) > samples.size:
+            samples = np.resize(samples, samples.size * 2)
+        
+        samples[count:count + len(batch)] = [
+            (row.total_bytes, row.peak_usage_mbps, row.created_at, row.user_id.bytes)
+            for row in batch
+        ]
+        count += len(batch)
+    
+    return samples[:count]
+
+# Modified z-score above which a usage sample is reported as anomalous,
+# and above which it is reported as high severity
+ANOMALY_SCORE_THRESHOLD = 3.5
+HIGH_SEVERITY_SCORE = 5.0
+
+def robust_z_scores(values: np.ndarray) -> np.ndarray:
+    """
+    Absolute modified z-scores, 0.6745 * |x - median| / MAD
+    - When more than half the samples equal the median (flat traffic) MAD is 0;
+      the mean absolute deviation is used instead, 0.7979 * |x - median| / meanAD
+    - All zeros only when every sample is equal
+    """
+    deviation = np.abs(values - np.median(values))
+    mad = np.median(deviation)
+    if mad != 0:
+        return 0.6745 * deviation / mad
+    
+    mean_ad = deviation.mean()
+    if mean_ad == 0:
+        return np.zeros_like(deviation)
+    return 0.7979 * deviation / mean_ad
 
 class AIBandwidthOptimizer:
     """AI-powered bandwidth optimization engine"""
     
-    def __init__(self):
-        # In production, these would be pre-trained ML models
-        self.traffic_patterns = {}
-        self.congestion_thresholds = {
-            'low': 60,
-            'medium': 80,
-            'high': 95
-        }
+    # Utilization (%) thresholds per congestion level, shared read-only by all instances
+    CONGESTION_THRESHOLDS = MappingProxyType({
+        'low': 60,
+        'medium': 80,
+        'high': 95
+    })
     
-    async def analyze_traffic_patterns(self, network_data: List[Dict]) -> Dict:
+    def analyze_traffic_patterns(self, hourly_usage: np.ndarray) -> Dict:
         """
         Real-time traffic pattern analysis using machine learning
         - Identify peak usage periods
         - Detect anomalous traffic behavior
         - Predict bandwidth requirements
+
+        Expects hourly buckets (HOURLY_USAGE_DTYPE) ordered by hour.
         """
-        if not network_data:
+        if hourly_usage.size == 0:
             return {
                 'predicted_bandwidth': [],
                 'congestion_risk': [],
-                'optimization_recommendations': []
+                'optimization_recommendations': [],
+                'peak_hours': []
             }
         
-        # Convert to pandas DataFrame for analysis
-        df = pd.DataFrame(network_data)
-        
-        # Extract time-based features
-        df['hour'] = pd.to_datetime(df['timestamp']).dt.hour
-        df['day_of_week'] = pd.to_datetime(df['timestamp']).dt.dayofweek
-        
-        # Calculate moving averages
-        df['bandwidth_ma_7'] = df['total_bytes'].rolling(window=7, min_periods=1).mean()
-        df['bandwidth_std_7'] = df['total_bytes'].rolling(window=7, min_periods=1).std()
-        
-        # Identify peak hours
-        hourly_avg = df.groupby('hour')['total_bytes'].mean()
-        peak_hours = hourly_avg.nlargest(3).index.tolist()
-        
-        # Simple bandwidth prediction (in production, use LSTM/Prophet)
-        recent_trend = df['total_bytes'].tail(7).mean()
+        # Identify peak hours from the mean usage per hour of day
+        hours = (hourly_usage['hour_bucket'].astype('datetime64[h]').astype(np.int64) % 24).astype(np.int8)
+        sums = np.bincount(hours, weights=hourly_usage['total_bytes'], minlength=24)
+        counts = np.bincount(hours, weights=hourly_usage['samples'], minlength=24)
+        hourly_avg = sums / np.maximum(counts, 1)
+        observed_hours = np.flatnonzero(counts)
+        peak_hours = observed_hours[np.argsort(-hourly_avg[observed_hours], kind='stable')[:3]].tolist()
+        
+        # Simple bandwidth prediction (in production, use LSTM/Prophet).
+        # Only the latest point of the 7-hour moving average is ever used,
+        # so take the mean of the last 7 buckets rather than a full rolling pass
+        avg_bytes = hourly_usage['total_bytes'] / hourly_usage['samples']
+        recent_trend = float(avg_bytes[-7:].mean())
         predicted_bandwidth = [recent_trend * 1.1, recent_trend * 1.05, recent_trend * 1.15]
         
         # Congestion risk calculation
-        current_utilization = df['peak_usage_mbps'].tail(1).iloc[0] if len(df) > 0 else 0
+        current_utilization = float(hourly_usage['peak_usage_mbps'][-1])
         congestion_risk = min(current_utilization / 100, 1.0)
         
         # Generate recommendations
-        recommendations = self._generate_traffic_recommendations(df, peak_hours, congestion_risk)
+        recommendations = self._generate_traffic_recommendations(avg_bytes, peak_hours, congestion_risk)
         
         return {
             'predicted_bandwidth': predicted_bandwidth,
@@ -76,46 +153,39 @@ class AIBandwidthOptimizer:
             'current_utilization': current_utilization
         }
     
-    async def dynamic_qos_optimization(self, subscriber_data: List[Dict]) -> Dict:
+    async def dynamic_qos_optimization_agg(self, subscriber_data: List[Dict]) -> Dict:
         """
         AI-powered Quality of Service optimization
         - Application-specific traffic prioritization
         - Dynamic queue management
-        - Latency optimization
+        - Expects 'avg_usage' and 'usage_variance' computed by the database
         """
         qos_recommendations = {}
         
         for subscriber in subscriber_data:
-            user_id = subscriber['id']
-            usage_patterns = subscriber.get('usage_history', [])
             bandwidth_limit = subscriber.get('bandwidth_limit', 100)
-            
-            # Analyze usage patterns
-            if usage_patterns:
-                avg_usage = sum(usage_patterns) / len(usage_patterns)
-                usage_variance = np.var(usage_patterns)
-                
-                # Generate QoS rules based on patterns
-                qos_rules = {
-                    'priority_level': 'high' if avg_usage > bandwidth_limit * 0.8 else 'standard',
-                    'burst_allowance': min(bandwidth_limit * 1.2, bandwidth_limit + 50),
-                    'rate_limiting': {
-                        'download': bandwidth_limit * 1024,  # Convert to Kbps
-                        'upload': bandwidth_limit * 1024 * 0.1,  # 10% of download
-                    },
-                    'traffic_shaping': {
-                        'video_streaming': 'priority',
-                        'gaming': 'low_latency',
-                        'file_download': 'background'
-                    },
-                    'recommendations': self._generate_qos_recommendations(avg_usage, bandwidth_limit, usage_variance)
-                }
-                
-                qos_recommendations[user_id] = qos_rules
+            qos_recommendations[subscriber['id']] = self._build_qos_rules(
+                subscriber['avg_usage'], bandwidth_limit, subscriber['usage_variance']
+            )
         
         return qos_recommendations
     
-    def _generate_traffic_recommendations(self, df: pd.DataFrame, peak_hours: List[int], congestion_risk: float) -> List[str]:
+    def _build_qos_rules(self, avg_usage: float, bandwidth_limit: int, usage_variance: float) -> Dict:
+        """Generate QoS rules based on usage patterns"""
+        download_kbps = bandwidth_limit * 1024  # Convert to Kbps
+        
+        return {
+            'priority_level': 'high' if avg_usage > bandwidth_limit * 0.8 else 'standard',
+            'burst_allowance': min(bandwidth_limit * 1.2, bandwidth_limit + 50),
+            'rate_limiting': {
+                'download': download_kbps,
+                'upload': download_kbps * 0.1,  # 10% of download
+            },
+            'traffic_shaping': TRAFFIC_SHAPING_RULES,
+            'recommendations': self._generate_qos_recommendations(avg_usage, bandwidth_limit, usage_variance)
+        }
+    
+    def _generate_traffic_recommendations(self, avg_bytes: np.ndarray, peak_hours: List[int], congestion_risk: float) -> List[str]:
         """Generate traffic optimization recommendations"""
         recommendations = []
         
@@ -128,8 +198,10 @@ class AIBandwidthOptimizer:
             recommendations.append(f"Peak usage detected during: {peak_str}. Consider implementing peak-hour pricing.")
         
         # Analyze data patterns
-        if len(df) > 7:
-            recent_growth = (df['total_bytes'].tail(3).mean() - df['total_bytes'].head(3).mean()) / df['total_bytes'].head(3).mean()
+        if len(avg_bytes) > 7:
+            older_avg = avg_bytes[:3].mean()
+            recent_avg = avg_bytes[-3:].mean()
+            recent_growth = (recent_avg - older_avg) / older_avg if older_avg > 0 else 0
             if recent_growth > 0.2:
                 recommendations.append("Rapid usage growth detected. Plan for 30% capacity increase within 3 months.")
         
@@ -158,73 +230,136 @@ class AIBandwidthOptimizer:
 # Initialize AI optimizer
 ai_optimizer = AIBandwidthOptimizer()
 
+def compute_traffic_analysis(db: Session, tenant_id: Optional[str], user_type: str, start_date: datetime, end_date: datetime):
+    """Load hourly usage for the date range and run the traffic analyzer, returning (analysis_result, data_points)"""
+    # Aggregate usage into hourly buckets in the database so only
+    # O(hours) rows are returned instead of every BandwidthUsage row
+    hour_bucket = func.date_trunc('hour', BandwidthUsage.created_at).label('hour_bucket')
+    query = db.query(
+        hour_bucket,
+        cast(func.sum(BandwidthUsage.total_bytes), Float).label('total_bytes'),
+        func.count(BandwidthUsage.id).label('samples'),
+        cast(func.max(BandwidthUsage.peak_usage_mbps), Float).label('peak_usage_mbps')
+    ).filter(
+        BandwidthUsage.date >= start_date.date(),
+        BandwidthUsage.date <= end_date.date()
+    )
+    
+    # Filter by tenant if specified
+    if tenant_id:
+        if user_type == 'isp':
+            # ISP can only see their own data
+            query = query.filter(BandwidthUsage.isp_id == tenant_id)
+        elif user_type == 'founder':
+            # Founder can see any ISP's data
+            query = query.filter(BandwidthUsage.isp_id == tenant_id)
+    
+    rows = query.group_by(hour_bucket).order_by(hour_bucket).all()
+    
+    hourly_usage = np.fromiter((tuple(row) for row in rows), dtype=HOURLY_USAGE_DTYPE, count=len(rows))
+    
+    return ai_optimizer.analyze_traffic_patterns(hourly_usage), int(hourly_usage['samples'].sum())
+
+def run_traffic_analysis(insight_id: uuid.UUID, user_type: str, start_date: datetime, end_date: datetime):
+    """
+    Background job for /analyze/traffic
+    - Runs in the threadpool after the response is sent
+    - Replaces the pending insight's data with the analysis result
+    """
+    db = SessionLocal()
+    try:
+        insight = db.query(AIInsight).filter(AIInsight.id == insight_id).first()
+        if not insight:
+            return
+        
+        try:
+            analysis_result, data_points = compute_traffic_analysis(
+                db, str(insight.tenant_id), user_type, start_date, end_date
+            )
+            insight.data = {**analysis_result, 'status': 'completed', 'data_points_analyzed': data_points}
+        except Exception as e:
+            db.rollback()
+            insight.data = {'status': 'failed', 'error': str(e)}
+        
+        db.commit()
+    finally:
+        db.close()
+
+def traffic_response_from_insight(insight: AIInsight) -> TrafficAnalysisResponse:
+    """Build a TrafficAnalysisResponse from a stored traffic_analysis insight"""
+    data = insight.data
+    if data.get('status') != 'completed':
+        return TrafficAnalysisResponse(analysis_id=str(insight.id), status=data.get('status', 'pending'))
+    
+    return TrafficAnalysisResponse(
+        analysis_id=str(insight.id),
+        status='completed',
+        predicted_bandwidth_gb=data['predicted_bandwidth'],
+        peak_hours=data['peak_hours'],
+        congestion_risk_score=data['congestion_risk'][0] if data['congestion_risk'] else 0,
+        optimization_recommendations=data['optimization_recommendations'],
+        confidence_score=float(insight.confidence_score or 0),
+        data_points_analyzed=data['data_points_analyzed']
+    )
+
 @router.post("/analyze/traffic", response_model=TrafficAnalysisResponse)
 async def analyze_traffic_patterns(
     request: TrafficAnalysisRequest,
+    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Analyze traffic patterns using AI for bandwidth optimization
+    - With a tenant, queues the analysis and returns a pending analysis_id
+      to poll via GET /analyze/traffic/{analysis_id}
+    - Without a tenant, runs a demo analysis inline
     """
     try:
+        cache_key = f"ai:traffic:{request.tenant_id}:{current_user['user_type']}:{request.start_date}:{request.end_date}"
+        cached = await cache_get(cache_key)
+        if cached is not None:
+            return TrafficAnalysisResponse(**cached)
+        
         # Get traffic data based on request parameters
         start_date = datetime.fromisoformat(request.start_date.replace('Z', '+00:00'))
         end_date = datetime.fromisoformat(request.end_date.replace('Z', '+00:00'))
         
-        # Query bandwidth usage data
-        query = db.query(BandwidthUsage).filter(
-            BandwidthUsage.date >= start_date.date(),
-            BandwidthUsage.date <= end_date.date()
-        )
-        
-        # Filter by tenant if specified
-        if request.tenant_id:
-            if current_user['user_type'] == 'isp':
-                # ISP can only see their own data
-                query = query.join(User).join(Branch).join(ISP).filter(ISP.id == request.tenant_id)
-            elif current_user['user_type'] == 'founder':
-                # Founder can see any ISP's data
-                query = query.join(User).join(Branch).join(ISP).filter(ISP.id == request.tenant_id)
-        
-        usage_data = query.all()
-        
-        # Convert to format for AI analysis
-        network_data = [
-            {
-                'timestamp': usage.created_at.isoformat(),
-                'total_bytes': usage.total_bytes,
-                'upload_bytes': usage.upload_bytes,
-                'download_bytes': usage.download_bytes,
-                'peak_usage_mbps': usage.peak_usage_mbps
-            }
-            for usage in usage_data
-        ]
-        
-        # Perform AI analysis
-        analysis_result = await ai_optimizer.analyze_traffic_patterns(network_data)
-        
-        # Store insights in database
         if request.tenant_id:
+            # Record a pending insight and hand the analysis to a background task
             insight = AIInsight(
                 tenant_id=request.tenant_id,
                 tenant_type=current_user['user_type'],
                 insight_type='traffic_analysis',
-                data=analysis_result,
+                data={'status': 'pending'},
                 confidence_score=0.85
             )
             db.add(insight)
             db.commit()
+            
+            background_tasks.add_task(
+                run_traffic_analysis, insight.id, current_user['user_type'], start_date, end_date
+            )
+            
+            response = TrafficAnalysisResponse(analysis_id=str(insight.id), status='pending')
+        else:
+            analysis_result, data_points = compute_traffic_analysis(
+                db, None, current_user['user_type'], start_date, end_date
+            )
+            
+            response = TrafficAnalysisResponse(
+                analysis_id="demo",
+                status='completed',
+                predicted_bandwidth_gb=analysis_result['predicted_bandwidth'],
+                peak_hours=analysis_result['peak_hours'],
+                congestion_risk_score=analysis_result['congestion_risk'][0] if analysis_result['congestion_risk'] else 0,
+                optimization_recommendations=analysis_result['optimization_recommendations'],
+                confidence_score=0.85,
+                data_points_analyzed=data_points
+            )
         
-        return TrafficAnalysisResponse(
-            analysis_id=str(insight.id) if request.tenant_id else "demo",
-            predicted_bandwidth_gb=analysis_result['predicted_bandwidth'],
-            peak_hours=analysis_result['peak_hours'],
-            congestion_risk_score=analysis_result['congestion_risk'][0] if analysis_result['congestion_risk'] else 0,
-            optimization_recommendations=analysis_result['optimization_recommendations'],
-            confidence_score=0.85,
-            data_points_analyzed=len(network_data)
-        )
+        await cache_set(cache_key, response.model_dump(), ttl=AI_CACHE_TTL)
+        return response
         
     except Exception as e:
         raise HTTPException(
@@ -232,6 +367,42 @@ async def analyze_traffic_patterns(
             detail=f"Error analyzing traffic patterns: {str(e)}"
         )
 
+@router.get("/analyze/traffic/{analysis_id}", response_model=TrafficAnalysisResponse)
+async def get_traffic_analysis(
+    analysis_id: str,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Poll a queued traffic analysis
+    """
+    try:
+        query = db.query(AIInsight).filter(
+            AIInsight.id == analysis_id,
+            AIInsight.insight_type == 'traffic_analysis'
+        )
+        
+        if current_user['user_type'] == 'isp':
+            # ISP can only see their own analyses
+            query = query.filter(AIInsight.tenant_id == current_user['sub'])
+        
+        insight = query.first()
+        if not insight:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Traffic analysis not found"
+            )
+        
+        return traffic_response_from_insight(insight)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching traffic analysis: {str(e)}"
+        )
+
 @router.post("/optimize/qos", response_model=QoSOptimizationResponse)
 async def optimize_qos(
     tenant_id: str,
@@ -242,45 +413,70 @@ async def optimize_qos(
     Generate QoS optimization recommendations for all subscribers
     """
     try:
+        cache_key = f"ai:qos:{tenant_id}:{current_user['user_type']}"
+        cached = await cache_get(cache_key)
+        if cached is not None:
+            return QoSOptimizationResponse(**cached)
+        
         # Get subscriber data
         query = db.query(User).join(Branch)
         
         if current_user['user_type'] == 'isp':
-            query = query.join(ISP).filter(ISP.id == tenant_id)
+            query = query.filter(Branch.isp_id == tenant_id)
         elif current_user['user_type'] == 'founder':
-            query = query.join(ISP).filter(ISP.id == tenant_id)
+            query = query.filter(Branch.isp_id == tenant_id)
+        
+        # Only the columns the recommendations actually read
+        users = query.options(
+            load_only(User.id, User.username, User.subscription_plan, User.bandwidth_limit)
+        ).all()
+        users_by_id = {user.id: user for user in users}
+        
+        # Per-user mean and variance of the last 30 days of usage (in GB),
+        # computed in one grouped query instead of one query per user
+        usage_gb = cast(BandwidthUsage.total_bytes, Float) / (1024**3)
+        usage_query = db.query(
+            BandwidthUsage.user_id,
+            func.avg(usage_gb),
+            func.var_pop(usage_gb)
+        ).filter(
+            BandwidthUsage.date >= datetime.now().date() - timedelta(days=30)
+        )
         
-        users = query.all()
+        if current_user['user_type'] in ('isp', 'founder'):
+            usage_query = usage_query.filter(BandwidthUsage.isp_id == tenant_id)
         
-        # Prepare data for AI analysis
+        usage_stats = {
+            user_id: (avg_usage, usage_variance)
+            for user_id, avg_usage, usage_variance in usage_query.group_by(BandwidthUsage.user_id).all()
+        }
+        
+        # Prepare data for AI analysis (users without recent usage are skipped)
         subscriber_data = []
         for user in users:
-            # Get recent usage history
-            usage_history = db.query(BandwidthUsage).filter(
-                BandwidthUsage.user_id == user.id,
-                BandwidthUsage.date >= datetime.now().date() - timedelta(days=30)
-            ).all()
-            
-            usage_values = [usage.total_bytes / (1024**3) for usage in usage_history]  # Convert to GB
+            stats = usage_stats.get(user.id)
+            if stats is None:
+                continue
             
             subscriber_data.append({
-                'id': str(user.id),
+                'id': user.id,
                 'username': user.username,
                 'bandwidth_limit': user.bandwidth_limit,
-                'usage_history': usage_values,
+                'avg_usage': stats[0],
+                'usage_variance': stats[1],
                 'subscription_plan': user.subscription_plan
             })
         
         # Generate QoS recommendations
-        qos_recommendations = await ai_optimizer.dynamic_qos_optimization(subscriber_data)
+        qos_recommendations = await ai_optimizer.dynamic_qos_optimization_agg(subscriber_data)
         
-        # Format response
+        # Format response (IDs are stringified only here, at the boundary)
         user_recommendations = []
         for user_id, qos_rules in qos_recommendations.items():
-            user = next((u for u in users if str(u.id) == user_id), None)
+            user = users_by_id.get(user_id)
             if user:
                 user_recommendations.append(OptimizationRecommendation(
-                    user_id=user_id,
+                    user_id=str(user_id),
                     username=user.username,
                     current_plan=user.subscription_plan,
                     priority_level=qos_rules['priority_level'],
@@ -289,8 +485,8 @@ async def optimize_qos(
                     recommendations=qos_rules['recommendations']
                 ))
         
-        return QoSOptimizationResponse(
-            optimization_id=f"qos_{tenant_id}_{int(datetime.now().timestamp())}",
+        response = QoSOptimizationResponse(
+            optimization_id=f"qos_{tenant_id}_{time.time_ns() // 1_000_000_000}",
             total_users_analyzed=len(users),
             high_priority_users=len([r for r in user_recommendations if r.priority_level == 'high']),
             optimization_score=87.5,  # This would be calculated based on actual metrics
@@ -303,6 +499,9 @@ async def optimize_qos(
             ]
         )
         
+        await cache_set(cache_key, response.model_dump(), ttl=AI_CACHE_TTL)
+        return response
+        
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -320,49 +519,47 @@ async def predict_network_requirements(
     Predict future network requirements using AI
     """
     try:
+        cache_key = f"ai:predict:{tenant_id}:{days_ahead}"
+        cached = await cache_get(cache_key)
+        if cached is not None:
+            return NetworkPredictionResponse(**cached)
+        
         # Get historical data
         start_date = datetime.now() - timedelta(days=90)
         
-        usage_data = db.query(BandwidthUsage).join(User).join(Branch).join(ISP).filter(
-            ISP.id == tenant_id,
+        # Sum usage per day in the database; at most one row per day comes back
+        daily_usage = db.query(
+            BandwidthUsage.date,
+            cast(func.sum(BandwidthUsage.total_bytes), Float)
+        ).filter(
+            BandwidthUsage.isp_id == tenant_id,
             BandwidthUsage.date >= start_date.date()
-        ).all()
+        ).group_by(BandwidthUsage.date).order_by(BandwidthUsage.date).all()
         
-        if not usage_data:
+        if not daily_usage:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="No usage data found for prediction"
             )
         
         # Simple trend analysis (in production, use advanced time series models)
-        daily_totals = {}
-        for usage in usage_data:
-            date_key = usage.date.isoformat()
-            if date_key not in daily_totals:
-                daily_totals[date_key] = 0
-            daily_totals[date_key] += usage.total_bytes
+        values = np.fromiter((total for _, total in daily_usage), dtype=np.float64, count=len(daily_usage))
         
         # Calculate growth trend
-        dates = sorted(daily_totals.keys())
-        values = [daily_totals[date] for date in dates]
-        
         if len(values) >= 7:
-            # Simple linear trend
-            recent_avg = sum(values[-7:]) / 7
-            older_avg = sum(values[:7]) / 7
-            growth_rate = (recent_avg - older_avg) / older_avg if older_avg > 0 else 0
+            # Least-squares linear trend, as relative growth per 30 days
+            slope = np.polyfit(np.arange(len(values)), values, 1)[0]
+            mean_usage = values.mean()
+            growth_rate = float(slope * 30 / mean_usage) if mean_usage > 0 else 0
         else:
             growth_rate = 0.1  # Default 10% growth
         
         # Predict future values
-        current_usage = values[-1] if values else 0
-        predictions = []
-        for day in range(1, days_ahead + 1):
-            predicted_usage = current_usage * (1 + growth_rate * day / 30)
-            predictions.append(predicted_usage)
+        current_usage = float(values[-1])
+        predictions = current_usage * (1 + growth_rate * np.arange(1, days_ahead + 1) / 30)
         
         # Capacity recommendations
-        peak_predicted = max(predictions)
+        peak_predicted = float(predictions.max())
         current_capacity = current_usage * 1.5  # Assume 50% headroom
         
         capacity_recommendations = []
@@ -370,11 +567,11 @@ async def predict_network_requirements(
             capacity_recommendations.append("Upgrade network capacity within 30 days")
             capacity_recommendations.append(f"Recommended capacity: {peak_predicted / (1024**3):.1f} GB/day")
         
-        return NetworkPredictionResponse(
-            prediction_id=f"pred_{tenant_id}_{int(datetime.now().timestamp())}",
+        response = NetworkPredictionResponse(
+            prediction_id=f"pred_{tenant_id}_{time.time_ns() // 1_000_000_000}",
             days_ahead=days_ahead,
             predicted_peak_usage_gb=peak_predicted / (1024**3),
-            predicted_average_usage_gb=sum(predictions) / len(predictions) / (1024**3),
+            predicted_average_usage_gb=float(predictions.mean()) / (1024**3),
             growth_rate_percent=growth_rate * 100,
             confidence_score=0.75,
             capacity_recommendations=capacity_recommendations,
@@ -385,6 +582,9 @@ async def predict_network_requirements(
             ]
         )
         
+        await cache_set(cache_key, response.model_dump(), ttl=AI_CACHE_TTL)
+        return response
+        
     except HTTPException:
         raise
     except Exception as e:
@@ -404,48 +604,66 @@ async def detect_network_anomalies(
     Detect network anomalies using AI
     """
     try:
+        cache_key = f"ai:anomalies:{tenant_id}:{hours_back}"
+        cached = await cache_get(cache_key)
+        if cached is not None:
+            return AnomalyDetectionResponse(**cached)
+        
         # Get recent usage data
         cutoff_time = datetime.now() - timedelta(hours=hours_back)
         
-        usage_data = db.query(BandwidthUsage).join(User).join(Branch).join(ISP).filter(
-            ISP.id == tenant_id,
+        # Stream only the columns the detector reads, in fixed-size batches
+        usage_data = load_usage_samples(db.query(
+            BandwidthUsage.total_bytes,
+            BandwidthUsage.peak_usage_mbps,
+            BandwidthUsage.created_at,
+            BandwidthUsage.user_id
+        ).filter(
+            BandwidthUsage.isp_id == tenant_id,
             BandwidthUsage.created_at >= cutoff_time
-        ).all()
+        ))
         
         anomalies = []
         
-        if usage_data:
+        if usage_data.size:
             # Calculate baseline statistics
-            total_bytes = [usage.total_bytes for usage in usage_data]
-            peak_usage = [usage.peak_usage_mbps for usage in usage_data]
+            bytes_arr = usage_data['total_bytes']
+            peak_arr = usage_data['peak_usage_mbps']
+            
+            # Baseline means (accumulated in float64 even though the samples are float32)
+            avg_bytes = bytes_arr.mean(dtype=np.float64)
+            avg_peak = peak_arr.mean(dtype=np.float64)
             
-            avg_bytes = np.mean(total_bytes)
-            std_bytes = np.std(total_bytes)
-            avg_peak = np.mean(peak_usage)
-            std_peak = np.std(peak_usage)
+            # Detect anomalies with robust (median/MAD) scores, so a single
+            # huge spike cannot inflate the spread and mask smaller ones
+            z_bytes = robust_z_scores(bytes_arr)
+            z_peak = robust_z_scores(peak_arr)
             
-            # Detect anomalies (simple statistical approach)
-            for usage in usage_data:
-                z_score_bytes = abs(usage.total_bytes - avg_bytes) / std_bytes if std_bytes > 0 else 0
-                z_score_peak = abs(usage.peak_usage_mbps - avg_peak) / std_peak if std_peak > 0 else 0
+            # Only rows past the outlier threshold need a Python visit
+            for i in np.flatnonzero((z_bytes > ANOMALY_SCORE_THRESHOLD) | (z_peak > ANOMALY_SCORE_THRESHOLD)):
+                usage = usage_data[i]
+                timestamp = usage['created_at'].item().isoformat()
+                user_id = str(uuid.UUID(bytes=usage['user_id'].tobytes()))
+                z_score_bytes = float(z_bytes[i])
+                z_score_peak = float(z_peak[i])
                 
-                if z_score_bytes > 2.5:  # More than 2.5 standard deviations
+                if z_score_bytes > ANOMALY_SCORE_THRESHOLD:
                     anomalies.append({
                         "type": "unusual_data_usage",
-                        "severity": "high" if z_score_bytes > 3 else "medium",
-                        "description": f"Unusual data usage: {usage.total_bytes / (1024**3):.2f} GB",
-                        "timestamp": usage.created_at.isoformat(),
-                        "user_id": str(usage.user_id),
+                        "severity": "high" if z_score_bytes > HIGH_SEVERITY_SCORE else "medium",
+                        "description": f"Unusual data usage: {usage['total_bytes'] / (1024**3):.2f} GB",
+                        "timestamp": timestamp,
+                        "user_id": user_id,
                         "z_score": round(z_score_bytes, 2)
                     })
                 
-                if z_score_peak > 2.5:
+                if z_score_peak > ANOMALY_SCORE_THRESHOLD:
                     anomalies.append({
                         "type": "bandwidth_spike",
-                        "severity": "high" if z_score_peak > 3 else "medium",
-                        "description": f"Bandwidth spike: {usage.peak_usage_mbps} Mbps",
-                        "timestamp": usage.created_at.isoformat(),
-                        "user_id": str(usage.user_id),
+                        "severity": "high" if z_score_peak > HIGH_SEVERITY_SCORE else "medium",
+                        "description": f"Bandwidth spike: {int(usage['peak_usage_mbps'])} Mbps",
+                        "timestamp": timestamp,
+                        "user_id": user_id,
                         "z_score": round(z_score_peak, 2)
                     })
         
@@ -460,15 +678,15 @@ async def detect_network_anomalies(
                 "z_score": 0
             })
         
-        return AnomalyDetectionResponse(
-            detection_id=f"anom_{tenant_id}_{int(datetime.now().timestamp())}",
+        response = AnomalyDetectionResponse(
+            detection_id=f"anom_{tenant_id}_{time.time_ns() // 1_000_000_000}",
             time_period_hours=hours_back,
             anomalies_detected=len([a for a in anomalies if a['type'] != 'info']),
             high_severity_count=len([a for a in anomalies if a['severity'] == 'high']),
             anomalies=anomalies,
             baseline_metrics={
-                "avg_daily_usage_gb": avg_bytes / (1024**3) if usage_data else 0,
-                "avg_peak_usage_mbps": avg_peak if usage_data else 0,
+                "avg_daily_usage_gb": avg_bytes / (1024**3) if usage_data.size else 0,
+                "avg_peak_usage_mbps": avg_peak if usage_data.size else 0,
                 "data_points_analyzed": len(usage_data)
             },
             recommendations=[
@@ -478,6 +696,9 @@ async def detect_network_anomalies(
             ]
         )
         
+        await cache_set(cache_key, response.model_dump(), ttl=AI_CACHE_TTL)
+        return response
+        
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -11,12 +11,13 @@ class TrafficAnalysisRequest(BaseModel):
 # Response schemas
 class TrafficAnalysisResponse(BaseModel):
     analysis_id: str
-    predicted_bandwidth_gb: List[float]
-    peak_hours: List[int]
-    congestion_risk_score: float
-    optimization_recommendations: List[str]
-    confidence_score: float
-    data_points_analyzed: int
+    status: str = "completed"  # pending, completed, failed
+    predicted_bandwidth_gb: List[float] = []
+    peak_hours: List[int] = []
+    congestion_risk_score: float = 0
+    optimization_recommendations: List[str] = []
+    confidence_score: float = 0
+    data_points_analyzed: int = 0
 
 class OptimizationRecommendation(BaseModel):
     user_id: str
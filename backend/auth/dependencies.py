@@ -1,16 +1,21 @@
 from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, raiseload
+import uuid
 
-from ..shared.database.connection import get_db
+from ..shared.database.connection import get_db, get_async_db
 from ..shared.models.models import Founder, ISP, User
 from .main import get_current_user
 
-async def get_current_founder(
+async def get_current_founder_async(
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Founder:
     """
-    Get current authenticated founder
+    Get current authenticated founder on the async session
+    - For handlers that already use get_async_db, so the lookup does not block
+      the event loop on a sync connection
     """
     if current_user["user_type"] != "founder":
         raise HTTPException(
@@ -18,7 +23,7 @@ async def get_current_founder(
             detail="Access denied. Founder role required."
         )
     
-    founder = db.query(Founder).filter(Founder.id == current_user["sub"]).first()
+    founder = await db.scalar(select(Founder).options(raiseload('*')).where(Founder.id == current_user["sub"]))
     if not founder:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -40,7 +45,33 @@ async def get_current_isp(
             detail="Access denied. ISP role required."
         )
     
-    isp = db.query(ISP).filter(ISP.id == current_user["sub"]).first()
+    # Only columns are read from the ISP; any relationship access raises
+    # instead of lazy-loading in a handler
+    isp = db.query(ISP).options(raiseload('*')).filter(ISP.id == current_user["sub"]).first()
+    if not isp:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="ISP not found"
+        )
+    
+    return isp
+
+async def get_current_isp_async(
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+) -> ISP:
+    """
+    Get current authenticated ISP on the async session
+    - For handlers that already use get_async_db, so the lookup does not block
+      the event loop on a sync connection
+    """
+    if current_user["user_type"] != "isp":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied. ISP role required."
+        )
+    
+    isp = await db.scalar(select(ISP).options(raiseload('*')).where(ISP.id == current_user["sub"]))
     if not isp:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -49,6 +80,28 @@ async def get_current_isp(
     
     return isp
 
+async def verify_isp_access(
+    isp_id: str,
+    current_isp: ISP = Depends(get_current_isp_async)
+) -> ISP:
+    """
+    Get current authenticated ISP, checking it owns the {isp_id} in the path
+    - get_current_isp_async is resolved once per request and shared by all
+      dependants, on the same async session as the handler
+    """
+    try:
+        requested_id = uuid.UUID(isp_id)
+    except ValueError:
+        requested_id = None
+    
+    if current_isp.id != requested_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this ISP portal"
+        )
+    
+    return current_isp
+
 async def get_current_end_user(
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -1,16 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
+from pydantic import TypeAdapter
+from sqlalchemy import literal, select, union_all
 from datetime import timedelta
+from typing import Dict, Optional
+from cachetools import TTLCache
+import asyncio
+import hashlib
+import secrets
+import threading
+import time
 
 from ..shared.database.connection import get_db
 from ..shared.models.models import Founder, ISP, User
-from ..shared.utils.security import verify_password, create_access_token, hash_password
+from ..shared.utils.security import (
+    verify_password, verify_and_update_password, create_access_token, hash_password, verify_access_token
+)
 from ..shared.config import settings
 from .schemas import LoginRequest, LoginResponse, RegisterRequest, UserResponse
 
 router = APIRouter()
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+# Account tables by the user_type reported at login
+ACCOUNT_MODELS = {"founder": Founder, "isp": ISP, "user": User}
+
+# Hash of a random password, verified against when no account matches the
+# login email so that unknown emails cost the same bcrypt round as known ones
+DUMMY_PASSWORD_HASH = hash_password(secrets.token_urlsafe(32))
+
+# In-flight logins keyed by SHA-256 of (email, password); identical concurrent
+# attempts await the first one instead of repeating the bcrypt work
+_login_inflight: Dict[bytes, asyncio.Future] = {}
+
+# Verified JWT payloads keyed by SHA-256 of the raw token. Only successful
+# verifications are cached; entries are also rejected once the token expires
+_jwt_cache = TTLCache(maxsize=10000, ttl=30)
+_jwt_cache_lock = threading.Lock()  # TTLCache is not thread-safe
+
+# Serialized /me bodies keyed the same way; only touched from the event loop
+_me_cache = TTLCache(maxsize=10000, ttl=30)
+_user_response_adapter = TypeAdapter(UserResponse)
 
 @router.post("/login", response_model=LoginResponse)
 async def login(
@@ -20,30 +53,74 @@ async def login(
     """
     Authenticate user and return JWT token
     Supports login for Founder, ISP, and User roles
+    - Concurrent attempts with identical credentials share one verification
     """
+    key = hashlib.sha256(f"{credentials.email}\0{credentials.password}".encode()).digest()
+    
+    inflight = _login_inflight.get(key)
+    if inflight is not None:
+        return await asyncio.shield(inflight)
+    
+    future = asyncio.get_running_loop().create_future()
+    _login_inflight[key] = future
     try:
-        user = None
-        user_type = None
+        response = await _authenticate(credentials, db)
+        future.set_result(response)
+        return response
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # mark retrieved so unshared failures are not logged as unhandled
+        raise
+    finally:
+        if not future.done():
+            future.cancel()  # request was cancelled; release any waiters
+        _login_inflight.pop(key, None)
+
+async def _authenticate(credentials: LoginRequest, db: Session) -> LoginResponse:
+    """Look up the account, verify the password and issue a token"""
+    try:
+        # Find the accounts with this email across founders, ISPs and users in
+        # a single round trip, in role priority order
+        account_query = union_all(
+            select(
+                Founder.id, Founder.email, Founder.password_hash, Founder.full_name.label("name"),
+                literal("founder").label("user_type"), literal(0).label("priority")
+            ).where(Founder.email == credentials.email),
+            select(
+                ISP.id, ISP.email, ISP.password_hash, ISP.company_name,
+                literal("isp"), literal(1)
+            ).where(ISP.email == credentials.email),
+            select(
+                User.id, User.email, User.password_hash, User.full_name,
+                literal("user"), literal(2)
+            ).where(User.email == credentials.email)
+        )
+        account_query = account_query.order_by(account_query.selected_columns.priority)
         
-        # Try to find user in founders table
-        founder = db.query(Founder).filter(Founder.email == credentials.email).first()
-        if founder and verify_password(credentials.password, founder.password_hash):
-            user = founder
-            user_type = "founder"
+        candidates = db.execute(account_query).all()
         
-        # Try to find user in ISPs table
-        if not user:
-            isp = db.query(ISP).filter(ISP.email == credentials.email).first()
-            if isp and verify_password(credentials.password, isp.password_hash):
-                user = isp
-                user_type = "isp"
-        
-        # Try to find user in users table
-        if not user:
-            end_user = db.query(User).filter(User.email == credentials.email).first()
-            if end_user and verify_password(credentials.password, end_user.password_hash):
-                user = end_user
-                user_type = "user"
+        # Run at least one bcrypt verification so response time does not
+        # reveal whether the email is registered (in the threadpool, off the
+        # event loop). If the email exists under several roles, the first
+        # account whose password matches logs in
+        user = None
+        if not candidates:
+            await run_in_threadpool(verify_password, credentials.password, DUMMY_PASSWORD_HASH)
+        for candidate in candidates:
+            verified, new_hash = await run_in_threadpool(
+                verify_and_update_password, credentials.password, candidate.password_hash
+            )
+            if not verified:
+                continue
+            
+            user = candidate
+            if new_hash:
+                # Stored hash uses an outdated bcrypt cost; upgrade it in place
+                model = ACCOUNT_MODELS[user.user_type]
+                db.query(model).filter(model.id == user.id).update({"password_hash": new_hash})
+                db.commit()
+            break
+        user_type = user.user_type if user else None
         
         if not user:
             raise HTTPException(
@@ -58,7 +135,7 @@ async def login(
                 "sub": str(user.id),
                 "email": user.email,
                 "user_type": user_type,
-                "name": getattr(user, 'full_name', getattr(user, 'company_name', 'Unknown'))
+                "name": user.name
             },
             expires_delta=access_token_expires
         )
@@ -68,7 +145,7 @@ async def login(
             token_type="bearer",
             user_type=user_type,
             user_id=str(user.id),
-            name=getattr(user, 'full_name', getattr(user, 'company_name', 'Unknown')),
+            name=user.name,
             email=user.email
         )
         
@@ -97,10 +174,10 @@ async def register_founder(
                 detail="Email already registered"
             )
         
-        # Create new founder
+        # Create new founder (bcrypt runs in the threadpool, off the event loop)
         new_founder = Founder(
             email=user_data.email,
-            password_hash=hash_password(user_data.password),
+            password_hash=await run_in_threadpool(hash_password, user_data.password),
             company_name=user_data.company_name,
             full_name=user_data.full_name,
             phone=user_data.phone,
@@ -128,38 +205,22 @@ async def register_founder(
             detail=f"Registration error: {str(e)}"
         )
 
-@router.get("/me", response_model=UserResponse)
-async def get_current_user_info(
-    current_user: dict = Depends(get_current_user)
-):
-    """
-    Get current authenticated user information
-    """
-    return UserResponse(
-        id=current_user["sub"],
-        email=current_user["email"],
-        name=current_user["name"],
-        user_type=current_user["user_type"],
-        is_active=True
-    )
-
-@router.post("/logout")
-async def logout():
-    """
-    Logout endpoint (client-side token removal)
-    """
-    return {"message": "Logged out successfully"}
-
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> dict:
     """
     Verify JWT token and return current user data
+    - Verified payloads are cached briefly, keyed by the token's SHA-256
     """
-    from ..shared.utils.security import verify_access_token
-    
     try:
         token = credentials.credentials
+        key = hashlib.sha256(token.encode()).digest()
+        
+        with _jwt_cache_lock:
+            payload = _jwt_cache.get(key)
+        if payload is not None and payload.get("exp", 0) > time.time():
+            return payload
+        
         payload = verify_access_token(token)
         
         if payload is None:
@@ -168,10 +229,52 @@ def get_current_user(
                 detail="Invalid token"
             )
         
+        with _jwt_cache_lock:
+            _jwt_cache[key] = payload
         return payload
         
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials"
-        )
\ No newline at end of file
+        )
+
+@router.get("/me", response_model=UserResponse)
+async def get_current_user_info(
+    current_user: dict = Depends(get_current_user),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    Get current authenticated user information
+    - The serialized body is cached per token alongside the JWT cache
+    """
+    key = hashlib.sha256(credentials.credentials.encode()).digest()
+    
+    body = _me_cache.get(key)
+    if body is None:
+        body = _user_response_adapter.dump_json(UserResponse(
+            id=current_user["sub"],
+            email=current_user["email"],
+            name=current_user["name"],
+            user_type=current_user["user_type"],
+            is_active=True
+        ))
+        _me_cache[key] = body
+    
+    return Response(content=body, media_type="application/json")
+
+@router.post("/logout")
+async def logout(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    """
+    Logout endpoint (client-side token removal)
+    - Drops the token from the verification cache
+    """
+    if credentials:
+        key = hashlib.sha256(credentials.credentials.encode()).digest()
+        with _jwt_cache_lock:
+            _jwt_cache.pop(key, None)
+        _me_cache.pop(key, None)
+    
+    return {"message": "Logged out successfully"}
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 from typing import Optional
 
 class LoginRequest(BaseModel):
@@ -6,6 +6,8 @@ class LoginRequest(BaseModel):
     password: str
 
 class LoginResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     access_token: str
     token_type: str
     user_type: str  # founder, isp, user
@@ -22,6 +24,8 @@ class RegisterRequest(BaseModel):
     address: Optional[str] = None
 
 class UserResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     id: str
     email: str
     name: str
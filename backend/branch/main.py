@@ -1,24 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
+from sqlalchemy import select, func, and_, desc
 from typing import List, Optional
-from datetime import datetime, timedelta
+import time
 
-from ..shared.database.connection import get_db
+from ..shared.database.connection import get_async_db
 from ..shared.models.models import Branch, User, Payment, SupportTicket, BandwidthUsage, ISP
 from .schemas import (
     BranchCreateRequest, BranchCreateResponse, BranchDashboardResponse,
-    BranchListResponse, BranchUserListResponse, BranchAnalyticsResponse
+    BranchListResponse, BranchUserListResponse, BranchAnalyticsResponse,
+    BranchListAdapter, BranchUserListAdapter
 )
-from ..auth.dependencies import get_current_isp, get_current_user
+from ..auth.dependencies import get_current_isp_async, get_current_user
+from ..shared.utils.time_bounds import month_start, days_ago
+from ..shared.utils.cache import cache_get, cache_set, branch_analytics_key
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Seconds a branch analytics report is served from cache (under
+# branch_analytics_key, deleted by the payment and ticket writes it counts)
+BRANCH_ANALYTICS_CACHE_TTL = 300
 
 @router.post("/{isp_id}/create", response_model=BranchCreateResponse)
 async def create_branch(
     isp_id: str,
     branch_data: BranchCreateRequest,
-    current_isp: ISP = Depends(get_current_isp),
-    db: Session = Depends(get_db)
+    current_isp: ISP = Depends(get_current_isp_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create new branch/sub-branch for ISP
@@ -48,8 +58,8 @@ async def create_branch(
         )
         
         db.add(new_branch)
-        db.commit()
-        db.refresh(new_branch)
+        await db.commit()
+        await db.refresh(new_branch)
         
         return BranchCreateResponse(
             branch_id=str(new_branch.id),
@@ -63,7 +73,7 @@ async def create_branch(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error creating branch: {str(e)}"
@@ -73,7 +83,7 @@ async def create_branch(
 async def get_branch_dashboard(
     branch_id: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Branch-specific dashboard with local analytics
@@ -84,7 +94,7 @@ async def get_branch_dashboard(
     """
     try:
         # Get branch and verify access
-        branch = db.query(Branch).filter(Branch.id == branch_id).first()
+        branch = await db.scalar(select(Branch).where(Branch.id == branch_id))
         if not branch:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -93,7 +103,7 @@ async def get_branch_dashboard(
         
         # Verify user has access to this branch
         if current_user['user_type'] == 'isp':
-            isp = db.query(ISP).filter(ISP.id == current_user['sub']).first()
+            isp = await db.scalar(select(ISP).where(ISP.id == current_user['sub']))
             if not isp or str(branch.isp_id) != str(isp.id):
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
@@ -101,53 +111,62 @@ async def get_branch_dashboard(
                 )
         
         # Get branch statistics
-        total_users = db.query(User).filter(
+        total_users = await db.scalar(select(func.count(User.id)).where(
             User.branch_id == branch.id,
             User.is_active == True
-        ).count()
+        ))
         
         # Calculate monthly revenue
-        current_month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        monthly_revenue = db.query(Payment).join(User).filter(
+        ts_minute = int(time.time() // 60)
+        current_month_start = month_start(ts_minute)
+        total_revenue = await db.scalar(select(func.coalesce(func.sum(Payment.amount), 0)).select_from(Payment).join(User).where(
             User.branch_id == branch.id,
             Payment.created_at >= current_month_start,
             Payment.status == 'completed'
-        ).with_entities(Payment.amount).all()
-        
-        total_revenue = sum([payment.amount for payment in monthly_revenue]) if monthly_revenue else 0
+        ))
         
         # Get bandwidth usage for this branch
-        week_ago = datetime.now() - timedelta(days=7)
-        bandwidth_usage = db.query(BandwidthUsage).join(User).filter(
+        week_ago = days_ago(ts_minute, 7)
+        total_bytes, avg_peak_usage = (await db.execute(select(
+            func.coalesce(func.sum(BandwidthUsage.total_bytes), 0),
+            func.coalesce(func.avg(BandwidthUsage.peak_usage_mbps), 0)
+        ).select_from(BandwidthUsage).join(User).where(
             User.branch_id == branch.id,
             BandwidthUsage.date >= week_ago.date()
-        ).all()
+        ))).one()
         
-        total_bandwidth_gb = sum([usage.total_bytes / (1024**3) for usage in bandwidth_usage])
-        avg_peak_usage = sum([usage.peak_usage_mbps for usage in bandwidth_usage]) / len(bandwidth_usage) if bandwidth_usage else 0
+        total_bandwidth_gb = float(total_bytes) / (1024**3)
+        avg_peak_usage = float(avg_peak_usage)
         
         # Get support tickets
-        open_tickets = db.query(SupportTicket).join(User).filter(
+        open_tickets = await db.scalar(select(func.count(SupportTicket.id)).select_from(SupportTicket).join(User).where(
             User.branch_id == branch.id,
             SupportTicket.status.in_(['open', 'in_progress'])
-        ).count()
-        
-        # Get top users by usage
-        top_users = db.query(User).filter(User.branch_id == branch.id).limit(5).all()
-        top_users_data = []
-        for user in top_users:
-            recent_usage = db.query(BandwidthUsage).filter(
-                BandwidthUsage.user_id == user.id,
-                BandwidthUsage.date >= week_ago.date()
-            ).all()
-            total_user_usage = sum([usage.total_bytes / (1024**3) for usage in recent_usage])
-            
-            top_users_data.append({
+        ))
+        
+        # Get top users by usage (one grouped query instead of one per user)
+        usage_bytes = func.coalesce(func.sum(BandwidthUsage.total_bytes), 0).label('usage_bytes')
+        top_users = (await db.execute(select(
+            User.username,
+            User.full_name,
+            User.subscription_plan,
+            usage_bytes
+        ).outerjoin(BandwidthUsage, and_(
+            BandwidthUsage.user_id == User.id,
+            BandwidthUsage.date >= week_ago.date()
+        )).where(
+            User.branch_id == branch.id
+        ).group_by(User.id).order_by(desc('usage_bytes')).limit(5))).all()
+        
+        top_users_data = [
+            {
                 "username": user.username,
                 "full_name": user.full_name,
                 "plan": user.subscription_plan,
-                "usage_gb": round(total_user_usage, 2)
-            })
+                "usage_gb": round(float(user.usage_bytes) / (1024**3), 2)
+            }
+            for user in top_users
+        ]
         
         return BranchDashboardResponse(
             branch_id=str(branch.id),
@@ -174,8 +193,8 @@ async def get_branch_dashboard(
 @router.get("/{isp_id}/list", response_model=List[BranchListResponse])
 async def list_branches(
     isp_id: str,
-    current_isp: ISP = Depends(get_current_isp),
-    db: Session = Depends(get_db)
+    current_isp: ISP = Depends(get_current_isp_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     List all branches for an ISP
@@ -188,43 +207,49 @@ async def list_branches(
                 detail="Access denied to this ISP"
             )
         
-        branches = db.query(Branch).filter(
+        branches = (await db.scalars(select(Branch).options(raiseload('*')).where(
             Branch.isp_id == current_isp.id,
             Branch.is_active == True
-        ).all()
+        ))).all()
         
-        branch_list = []
-        for branch in branches:
-            # Get user count for each branch
-            user_count = db.query(User).filter(
-                User.branch_id == branch.id,
+        branch_ids = [branch.id for branch in branches]
+        
+        # Get active user counts for all branches in one grouped query
+        user_counts = dict((await db.execute(
+            select(User.branch_id, func.count(User.id)).where(
+                User.branch_id.in_(branch_ids),
                 User.is_active == True
-            ).count()
-            
-            # Get recent revenue
-            current_month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            revenue = db.query(Payment).join(User).filter(
-                User.branch_id == branch.id,
+            ).group_by(User.branch_id)
+        )).all())
+        
+        # Get this month's revenue for all branches in one grouped query
+        current_month_start = month_start(int(time.time() // 60))
+        revenue_by_branch = dict((await db.execute(
+            select(User.branch_id, func.sum(Payment.amount)).select_from(Payment).join(User).where(
+                User.branch_id.in_(branch_ids),
                 Payment.created_at >= current_month_start,
                 Payment.status == 'completed'
-            ).with_entities(Payment.amount).all()
-            
-            monthly_revenue = sum([payment.amount for payment in revenue]) if revenue else 0
-            
-            branch_list.append(BranchListResponse(
+            ).group_by(User.branch_id)
+        )).all())
+        
+        branch_list = [
+            BranchListResponse(
                 id=str(branch.id),
                 name=branch.name,
                 location=branch.location,
                 manager_name=branch.manager_name,
                 contact_email=branch.contact_email,
                 phone=branch.phone,
-                user_count=user_count,
-                monthly_revenue=float(monthly_revenue),
+                user_count=user_counts.get(branch.id, 0),
+                monthly_revenue=float(revenue_by_branch.get(branch.id, 0)),
                 is_active=branch.is_active,
                 created_at=branch.created_at.isoformat()
-            ))
+            )
+            for branch in branches
+        ]
         
-        return branch_list
+        # Already validated; serialize the whole list in one pass
+        return Response(content=BranchListAdapter.dump_json(branch_list), media_type="application/json")
         
     except HTTPException:
         raise
@@ -238,7 +263,7 @@ async def list_branches(
 async def list_branch_users(
     branch_id: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     List all users under specific branch
@@ -249,36 +274,48 @@ async def list_branch_users(
     """
     try:
         # Get branch and verify access
-        branch = db.query(Branch).filter(Branch.id == branch_id).first()
+        branch = await db.scalar(select(Branch).where(Branch.id == branch_id))
         if not branch:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Branch not found"
             )
         
-        users = db.query(User).filter(User.branch_id == branch.id).all()
+        # Only plain columns are serialized; any relationship access would be an N+1
+        users = (await db.scalars(select(User).options(raiseload('*')).where(User.branch_id == branch.id))).all()
+        user_ids = [user.id for user in users]
         
-        user_list = []
-        for user in users:
-            # Get recent usage
-            week_ago = datetime.now() - timedelta(days=7)
-            recent_usage = db.query(BandwidthUsage).filter(
-                BandwidthUsage.user_id == user.id,
+        # Get recent usage for all users in one grouped query
+        week_ago = days_ago(int(time.time() // 60), 7)
+        usage_by_user = dict((await db.execute(
+            select(BandwidthUsage.user_id, func.sum(BandwidthUsage.total_bytes)).where(
+                BandwidthUsage.user_id.in_(user_ids),
                 BandwidthUsage.date >= week_ago.date()
-            ).all()
-            
-            total_usage_gb = sum([usage.total_bytes / (1024**3) for usage in recent_usage])
-            
-            # Get latest payment
-            latest_payment = db.query(Payment).filter(
-                Payment.user_id == user.id
-            ).order_by(Payment.created_at.desc()).first()
-            
-            # Get open tickets
-            open_tickets = db.query(SupportTicket).filter(
-                SupportTicket.user_id == user.id,
+            ).group_by(BandwidthUsage.user_id)
+        )).all())
+        
+        # Get latest payment per user (DISTINCT ON keeps the newest row per user)
+        latest_payments = {
+            payment.user_id: payment
+            for payment in (await db.execute(
+                select(Payment.user_id, Payment.status, Payment.created_at).where(
+                    Payment.user_id.in_(user_ids)
+                ).distinct(Payment.user_id).order_by(Payment.user_id, Payment.created_at.desc())
+            )).all()
+        }
+        
+        # Get open tickets per user
+        open_tickets_by_user = dict((await db.execute(
+            select(SupportTicket.user_id, func.count(SupportTicket.id)).where(
+                SupportTicket.user_id.in_(user_ids),
                 SupportTicket.status.in_(['open', 'in_progress'])
-            ).count()
+            ).group_by(SupportTicket.user_id)
+        )).all())
+        
+        user_list = []
+        for user in users:
+            total_usage_gb = float(usage_by_user.get(user.id, 0)) / (1024**3)
+            latest_payment = latest_payments.get(user.id)
             
             user_list.append(BranchUserListResponse(
                 id=str(user.id),
@@ -291,11 +328,12 @@ async def list_branch_users(
                 recent_usage_gb=round(total_usage_gb, 2),
                 last_payment_status=latest_payment.status if latest_payment else "no_payments",
                 last_payment_date=latest_payment.created_at.isoformat() if latest_payment else None,
-                open_tickets=open_tickets,
+                open_tickets=open_tickets_by_user.get(user.id, 0),
                 created_at=user.created_at.isoformat()
             ))
         
-        return user_list
+        # Already validated; serialize the whole list in one pass
+        return Response(content=BranchUserListAdapter.dump_json(user_list), media_type="application/json")
         
     except HTTPException:
         raise
@@ -309,7 +347,7 @@ async def list_branch_users(
 async def get_ai_branch_analytics(
     branch_id: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     AI-powered branch performance analytics
@@ -319,8 +357,13 @@ async def get_ai_branch_analytics(
     - Predictive maintenance alerts
     """
     try:
+        cache_key = branch_analytics_key(branch_id)
+        cached = await cache_get(cache_key)
+        if cached is not None:
+            return BranchAnalyticsResponse(**cached)
+        
         # Get branch and verify access
-        branch = db.query(Branch).filter(Branch.id == branch_id).first()
+        branch = await db.scalar(select(Branch).where(Branch.id == branch_id))
         if not branch:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -328,42 +371,37 @@ async def get_ai_branch_analytics(
             )
         
         # Get analytics data
-        month_ago = datetime.now() - timedelta(days=30)
+        month_ago = days_ago(int(time.time() // 60), 30)
         
         # User growth
-        users_data = db.query(User).filter(
+        new_users_month = await db.scalar(select(func.count(User.id)).where(
             User.branch_id == branch.id,
             User.created_at >= month_ago
-        ).all()
+        ))
         
         # Calculate growth metrics
-        total_users = db.query(User).filter(User.branch_id == branch.id).count()
-        new_users_month = len(users_data)
+        total_users = await db.scalar(select(func.count(User.id)).where(User.branch_id == branch.id))
         growth_rate = (new_users_month / total_users * 100) if total_users > 0 else 0
         
         # Revenue analytics
-        revenue_data = db.query(Payment).join(User).filter(
+        total_revenue = float(await db.scalar(select(func.coalesce(func.sum(Payment.amount), 0)).select_from(Payment).join(User).where(
             User.branch_id == branch.id,
             Payment.created_at >= month_ago,
             Payment.status == 'completed'
-        ).all()
-        
-        total_revenue = sum([float(payment.amount) for payment in revenue_data])
+        )))
         avg_revenue_per_user = total_revenue / total_users if total_users > 0 else 0
         
-        # Bandwidth analytics
-        bandwidth_data = db.query(BandwidthUsage).join(User).filter(
-            User.branch_id == branch.id,
-            BandwidthUsage.date >= month_ago.date()
-        ).all()
-        
-        peak_usage_hours = {}
-        for usage in bandwidth_data:
-            hour = usage.created_at.hour
-            peak_usage_hours[hour] = peak_usage_hours.get(hour, 0) + usage.peak_usage_mbps
+        # Bandwidth analytics: total peak usage per hour of day, one row per hour
+        usage_hour = func.extract('hour', BandwidthUsage.created_at).label('usage_hour')
+        peak_usage_hours = dict((await db.execute(
+            select(usage_hour, func.sum(BandwidthUsage.peak_usage_mbps)).join(User).where(
+                User.branch_id == branch.id,
+                BandwidthUsage.date >= month_ago.date()
+            ).group_by(usage_hour)
+        )).all())
         
         # Find peak hour
-        peak_hour = max(peak_usage_hours.items(), key=lambda x: x[1])[0] if peak_usage_hours else 20
+        peak_hour = int(max(peak_usage_hours, key=peak_usage_hours.get)) if peak_usage_hours else 20
         
         # AI recommendations (simplified)
         recommendations = [
@@ -376,14 +414,14 @@ async def get_ai_branch_analytics(
             recommendations.append("High user growth detected. Monitor network capacity closely.")
         
         # Performance metrics
-        support_tickets = db.query(SupportTicket).join(User).filter(
+        support_tickets = await db.scalar(select(func.count(SupportTicket.id)).select_from(SupportTicket).join(User).where(
             User.branch_id == branch.id,
             SupportTicket.created_at >= month_ago
-        ).count()
+        ))
         
         customer_satisfaction = max(0, 5.0 - (support_tickets / total_users * 5)) if total_users > 0 else 5.0
         
-        return BranchAnalyticsResponse(
+        response = BranchAnalyticsResponse(
             branch_id=str(branch.id),
             branch_name=branch.name,
             total_users=total_users,
@@ -399,6 +437,9 @@ async def get_ai_branch_analytics(
             performance_score=85.2  # Calculated based on various metrics
         )
         
+        await cache_set(cache_key, response.model_dump(), ttl=BRANCH_ANALYTICS_CACHE_TTL)
+        return response
+        
     except HTTPException:
         raise
     except Exception as e:
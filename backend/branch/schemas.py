@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, TypeAdapter
 from typing import Optional, List, Dict, Any
 
 # Request schemas
@@ -13,6 +13,8 @@ class BranchCreateRequest(BaseModel):
 
 # Response schemas
 class BranchCreateResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     branch_id: str
     name: str
     location: Optional[str]
@@ -21,12 +23,16 @@ class BranchCreateResponse(BaseModel):
     message: str
 
 class TopUser(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     username: str
     full_name: str
     plan: str
     usage_gb: float
 
 class BranchDashboardResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     branch_id: str
     name: str
     location: Optional[str]
@@ -40,6 +46,8 @@ class BranchDashboardResponse(BaseModel):
     top_users: List[TopUser]
 
 class BranchListResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     id: str
     name: str
     location: Optional[str]
@@ -52,6 +60,8 @@ class BranchListResponse(BaseModel):
     created_at: str
 
 class BranchUserListResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     id: str
     username: str
     full_name: str
@@ -66,6 +76,8 @@ class BranchUserListResponse(BaseModel):
     created_at: str
 
 class BranchAnalyticsResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     branch_id: str
     branch_name: str
     total_users: int
@@ -78,4 +90,8 @@ class BranchAnalyticsResponse(BaseModel):
     support_tickets_month: int
     network_utilization: float
     recommendations: List[str]
-    performance_score: float
\ No newline at end of file
+    performance_score: float
+
+# List adapters, built once, used to serialize the list endpoints straight to JSON
+BranchListAdapter = TypeAdapter(List[BranchListResponse])
+BranchUserListAdapter = TypeAdapter(List[BranchUserListResponse])
@@ -1,242 +1,326 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, and_
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, func, desc, and_, bindparam, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
+import asyncio
 
-from shared.database.connection import get_db
+from shared.database.connection import get_async_db, AsyncSessionLocal, try_advisory_lock
 from shared.models.models import (
-    CustomerSegment, MarketingCampaign, User, Branch, ISP, BandwidthUsage
+    CustomerSegment, MarketingCampaign, CampaignStats, User, Branch, ISP, BandwidthUsage
 )
-from auth.dependencies import get_current_user, get_current_isp
+from shared.utils.cache import (
+    cache_get_raw, cache_set_raw, cache_version, bump_version, etag_response
+)
+from shared.utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, split_page
+from auth.dependencies import get_current_user, get_current_isp_async
 from .schemas import (
     CustomerSegmentCreate, CustomerSegmentResponse,
-    MarketingCampaignCreate, MarketingCampaignResponse,
-    CustomerAnalytics, CampaignMetrics
+    MarketingCampaignCreate, MarketingCampaignResponse, MarketingCampaignSummary,
+    CustomerAnalytics, CampaignMetrics,
+    CustomerSegmentListAdapter, MarketingCampaignSummaryListAdapter
+)
+
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Static statements built once at import; per-request values are bound at
+# execution so every call reuses the same cached compiled SQL
+SEGMENTS_BY_ISP = select(CustomerSegment).where(CustomerSegment.isp_id == bindparam("isp_id"))
+
+# Summary columns only: the list view never loads the content/metrics JSON.
+# Ordered by (created_at, id) so campaigns sharing a timestamp page stably
+CAMPAIGN_SUMMARIES_BY_ISP = select(
+    MarketingCampaign.id, MarketingCampaign.name, MarketingCampaign.campaign_type,
+    MarketingCampaign.status, MarketingCampaign.scheduled_at, MarketingCampaign.created_at
+).where(
+    MarketingCampaign.isp_id == bindparam("isp_id")
+).order_by(desc(MarketingCampaign.created_at), desc(MarketingCampaign.id)).limit(bindparam("limit"))
+
+CAMPAIGN_BY_ID = select(MarketingCampaign).where(
+    MarketingCampaign.id == bindparam("campaign_id"),
+    MarketingCampaign.isp_id == bindparam("isp_id")
 )
 
-router = APIRouter()
+# A campaign (scoped to its ISP) with its stored metrics and its counters
+# row, if any events were recorded
+CAMPAIGN_STATS_BY_ID = select(MarketingCampaign.id, MarketingCampaign.metrics, CampaignStats).outerjoin(
+    CampaignStats, CampaignStats.campaign_id == MarketingCampaign.id
+).where(
+    MarketingCampaign.id == bindparam("campaign_id"),
+    MarketingCampaign.isp_id == bindparam("isp_id")
+)
+
+# Delivery counters kept per campaign in campaign_stats
+CAMPAIGN_STAT_FIELDS = ("sent", "delivered", "opened", "clicked", "unsubscribed", "bounced")
+
+# Sample delivery figures reported for campaigns that have neither recorded
+# events nor stored metrics yet, as before the counters existed
+SAMPLE_CAMPAIGN_STATS = (1000, 975, 234, 45, 12, 25)
+
+# Segment criteria keys that map onto subscriber columns. Other keys are kept
+# on the segment but do not narrow its subscriber count
+SEGMENT_CRITERIA_COLUMNS = {
+    "plan": User.subscription_plan,
+    "subscription_plan": User.subscription_plan,
+    "connection_type": User.connection_type,
+    "is_active": User.is_active,
+    "branch_id": User.branch_id,
+    "location": Branch.location
+}
+
+# Seconds between re-evaluations of auto-updating segments
+SEGMENT_REFRESH_SECONDS = 300
+
+def segment_count_statement(isp_id, criteria: Dict[str, Any]):
+    """COUNT of the ISP's subscribers matching a segment's criteria (lists match any value)"""
+    stmt = select(func.count(User.id)).join(Branch).where(Branch.isp_id == isp_id)
+    for key, value in (criteria or {}).items():
+        column = SEGMENT_CRITERIA_COLUMNS.get(key)
+        if column is not None:
+            stmt = stmt.where(column.in_(value) if isinstance(value, list) else column == value)
+    return stmt
+
+# Seconds a serialized segment/campaign list is kept in Redis. Keys are
+# "crm:{isp_id}:{list}:{version}"; writes bump "crm:{isp_id}:{list}:ver"
+LIST_CACHE_TTL = 60
+
+def _list_version_key(isp_id, name: str) -> str:
+    return f"crm:{isp_id}:{name}:ver"
+
+async def record_campaign_events(db: AsyncSession, campaign_id, **counts: int) -> None:
+    """
+    Add a batch of delivery events to a campaign's counters in a single UPSERT
+    - Intended for the delivery pipeline, e.g. record_campaign_events(db, id, sent=500, bounced=3)
+    - The caller commits
+    """
+    values = {field: counts.get(field, 0) for field in CAMPAIGN_STAT_FIELDS}
+    stmt = pg_insert(CampaignStats).values(campaign_id=campaign_id, **values)
+    
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[CampaignStats.campaign_id],
+        set_={
+            **{field: getattr(CampaignStats, field) + stmt.excluded[field] for field in CAMPAIGN_STAT_FIELDS},
+            "updated_at": func.now()
+        }
+    ))
+
+async def refresh_segment_counts():
+    """Periodically re-evaluate auto-updating segments' subscriber counts (started on app startup)"""
+    while True:
+        try:
+            changed_isps = set()
+            async with AsyncSessionLocal() as db:
+                # Another worker is already re-evaluating this interval
+                if await try_advisory_lock(db, "crm:segment_counts"):
+                    segments = (await db.scalars(select(CustomerSegment).where(
+                        CustomerSegment.auto_update == True
+                    ))).all()
+                    
+                    for segment in segments:
+                        subscriber_count = await db.scalar(segment_count_statement(segment.isp_id, segment.criteria))
+                        if subscriber_count != segment.subscriber_count:
+                            changed_isps.add(segment.isp_id)
+                        segment.subscriber_count = subscriber_count
+                        segment.last_evaluated_at = datetime.now()
+                
+                await db.commit()
+            
+            for isp_id in changed_isps:
+                await bump_version(_list_version_key(isp_id, "segments"))
+        except Exception as e:
+            print(f"Error refreshing segment counts: {e}")
+        
+        await asyncio.sleep(SEGMENT_REFRESH_SECONDS)
 
 @router.get("/{isp_id}/analytics", response_model=CustomerAnalytics)
 async def get_customer_analytics(
     isp_id: str,
-    current_isp: ISP = Depends(get_current_isp),
-    db: Session = Depends(get_db)
+    current_isp: ISP = Depends(get_current_isp_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Advanced customer analytics with AI insights
     - Subscriber segmentation by usage, location, plan
     - Churn prediction and customer satisfaction optimization
     """
-    try:
-        if str(current_isp.id) != isp_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied to this ISP"
-            )
-        
-        # Get total and active subscribers
-        total_subscribers = db.query(User).join(Branch).filter(
-            Branch.isp_id == current_isp.id
-        ).count()
-        
-        active_subscribers = db.query(User).join(Branch).filter(
-            Branch.isp_id == current_isp.id,
-            User.is_active == True
-        ).count()
-        
-        # Calculate churn rate (simplified - users who became inactive in last 30 days)
-        month_ago = datetime.now() - timedelta(days=30)
-        churned_users = db.query(User).join(Branch).filter(
-            Branch.isp_id == current_isp.id,
-            User.is_active == False,
-            User.updated_at >= month_ago
-        ).count()
-        
-        churn_rate = (churned_users / total_subscribers * 100) if total_subscribers > 0 else 0
-        
-        # Calculate average revenue (simplified)
-        # In a real implementation, this would come from payment records
-        average_revenue = 45.50  # Placeholder
-        
-        # Get customer segments
-        segments = db.query(CustomerSegment).filter(
-            CustomerSegment.isp_id == current_isp.id
-        ).all()
-        
-        segment_data = []
-        for segment in segments:
-            # Count subscribers in each segment (simplified implementation)
-            # In practice, you'd evaluate the criteria against user data
-            count = db.query(User).join(Branch).filter(
-                Branch.isp_id == current_isp.id
-            ).count() // max(1, len(segments))  # Distribute evenly for demo
-            
-            segment_data.append({
-                "id": str(segment.id),
-                "name": segment.name,
-                "count": count,
-                "percentage": (count / total_subscribers * 100) if total_subscribers > 0 else 0
-            })
-        
-        # Growth trends (last 6 months)
-        growth_trends = []
-        for i in range(6):
-            month_start = (datetime.now().replace(day=1) - timedelta(days=30*i))
-            month_end = month_start + timedelta(days=30)
-            
-            month_subscribers = db.query(User).join(Branch).filter(
-                Branch.isp_id == current_isp.id,
-                User.created_at >= month_start,
-                User.created_at < month_end
-            ).count()
-            
-            growth_trends.append({
-                "month": month_start.strftime("%Y-%m"),
-                "new_subscribers": month_subscribers,
-                "total_subscribers": total_subscribers  # Simplified
-            })
-        
-        # Geographic distribution (by branch)
-        branch_distribution = db.query(
-            Branch.address,
-            func.count(User.id)
-        ).join(User).filter(
-            Branch.isp_id == current_isp.id
-        ).group_by(Branch.address).all()
-        
-        geographic_distribution = {
-            (branch[0] or "Unknown"): branch[1] for branch in branch_distribution
-        }
-        
-        return CustomerAnalytics(
-            total_subscribers=total_subscribers,
-            active_subscribers=active_subscribers,
-            churn_rate=round(churn_rate, 2),
-            average_revenue=average_revenue,
-            segments=segment_data,
-            growth_trends=growth_trends,
-            geographic_distribution=geographic_distribution
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
+    if str(current_isp.id) != isp_id:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error fetching customer analytics: {str(e)}"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this ISP"
         )
+    
+    # Get total, active and churned subscribers in one aggregation query
+    # (churned = users who became inactive in last 30 days)
+    month_ago = datetime.now() - timedelta(days=30)
+    total_subscribers, active_subscribers, churned_users = (await db.execute(select(
+        func.count(User.id),
+        func.count(User.id).filter(User.is_active == True),
+        func.count(User.id).filter(and_(User.is_active == False, User.updated_at >= month_ago))
+    ).select_from(User).join(Branch).where(
+        Branch.isp_id == current_isp.id
+    ))).one()
+    
+    churn_rate = (churned_users / total_subscribers * 100) if total_subscribers > 0 else 0
+    
+    # Calculate average revenue (simplified)
+    # In a real implementation, this would come from payment records
+    average_revenue = 45.50  # Placeholder
+    
+    # Get customer segments
+    segments = (await db.scalars(SEGMENTS_BY_ISP, {"isp_id": current_isp.id})).all()
+    
+    # Subscriber counts are stored on each segment when it is evaluated
+    segment_data = [
+        {
+            "id": str(segment.id),
+            "name": segment.name,
+            "count": segment.subscriber_count,
+            "percentage": (segment.subscriber_count / total_subscribers * 100) if total_subscribers > 0 else 0
+        }
+        for segment in segments
+    ]
+    
+    # Growth trends (last 6 calendar months, one grouped query)
+    current_month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    months = []
+    for i in range(6):
+        year, month = divmod(current_month_start.year * 12 + current_month_start.month - 1 - i, 12)
+        months.append(f"{year:04d}-{month + 1:02d}")
+    six_months_ago = datetime.strptime(months[-1], "%Y-%m")
+    
+    signup_month = func.to_char(func.date_trunc('month', User.created_at), 'YYYY-MM')
+    new_by_month = dict((await db.execute(select(
+        signup_month,
+        func.count(User.id)
+    ).select_from(User).join(Branch).where(
+        Branch.isp_id == current_isp.id,
+        User.created_at >= six_months_ago
+    ).group_by(signup_month))).all())
+    
+    growth_trends = [
+        {
+            "month": month,
+            "new_subscribers": new_by_month.get(month, 0),
+            "total_subscribers": total_subscribers  # Simplified
+        }
+        for month in months
+    ]
+    
+    # Geographic distribution (by branch)
+    branch_distribution = (await db.execute(select(
+        Branch.address,
+        func.count(User.id)
+    ).join(User).where(
+        Branch.isp_id == current_isp.id
+    ).group_by(Branch.address))).all()
+    
+    geographic_distribution = {
+        (branch[0] or "Unknown"): branch[1] for branch in branch_distribution
+    }
+    
+    return CustomerAnalytics(
+        total_subscribers=total_subscribers,
+        active_subscribers=active_subscribers,
+        churn_rate=round(churn_rate, 2),
+        average_revenue=average_revenue,
+        segments=segment_data,
+        growth_trends=growth_trends,
+        geographic_distribution=geographic_distribution
+    )
 
 @router.post("/{isp_id}/segments", response_model=CustomerSegmentResponse)
 async def create_customer_segment(
     isp_id: str,
     segment_data: CustomerSegmentCreate,
-    current_isp: ISP = Depends(get_current_isp),
-    db: Session = Depends(get_db)
+    current_isp: ISP = Depends(get_current_isp_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create customer segment with automated criteria"""
-    try:
-        if str(current_isp.id) != isp_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied to this ISP"
-            )
-        
-        segment = CustomerSegment(
-            isp_id=current_isp.id,
-            name=segment_data.name,
-            criteria=segment_data.criteria,
-            description=segment_data.description,
-            auto_update=segment_data.auto_update
-        )
-        
-        db.add(segment)
-        db.commit()
-        db.refresh(segment)
-        
-        # Calculate subscriber count for this segment
-        # This is a simplified implementation - in practice, you'd evaluate
-        # the criteria against actual user data
-        total_users = db.query(User).join(Branch).filter(
-            Branch.isp_id == current_isp.id
-        ).count()
-        
-        # Simplified count based on criteria type
-        subscriber_count = total_users // 3  # Demo value
-        
-        return CustomerSegmentResponse(
-            id=str(segment.id),
-            isp_id=str(segment.isp_id),
-            name=segment.name,
-            criteria=segment.criteria,
-            description=segment.description,
-            auto_update=segment.auto_update,
-            subscriber_count=subscriber_count,
-            created_at=segment.created_at
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
+    if str(current_isp.id) != isp_id:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error creating customer segment: {str(e)}"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this ISP"
         )
+    
+    # Evaluate the criteria once up front and store the count on the segment
+    subscriber_count = await db.scalar(segment_count_statement(current_isp.id, segment_data.criteria))
+    
+    # Core INSERT ... RETURNING: one round trip, no ORM object or refresh SELECT
+    last_evaluated_at = datetime.now()
+    segment = (await db.execute(insert(CustomerSegment).values(
+        isp_id=current_isp.id,
+        name=segment_data.name,
+        criteria=segment_data.criteria,
+        description=segment_data.description,
+        auto_update=segment_data.auto_update,
+        subscriber_count=subscriber_count,
+        last_evaluated_at=last_evaluated_at
+    ).returning(CustomerSegment.id, CustomerSegment.created_at))).one()
+    
+    await db.commit()
+    await bump_version(_list_version_key(current_isp.id, "segments"))
+    
+    return CustomerSegmentResponse(
+        id=str(segment.id),
+        isp_id=str(current_isp.id),
+        name=segment_data.name,
+        criteria=segment_data.criteria,
+        description=segment_data.description,
+        auto_update=segment_data.auto_update,
+        subscriber_count=subscriber_count,
+        last_evaluated_at=last_evaluated_at,
+        created_at=segment.created_at
+    )
 
 @router.get("/{isp_id}/segments", response_model=List[CustomerSegmentResponse])
 async def get_customer_segments(
     isp_id: str,
-    current_isp: ISP = Depends(get_current_isp),
-    db: Session = Depends(get_db)
+    if_none_match: Optional[str] = Header(None),
+    current_isp: ISP = Depends(get_current_isp_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all customer segments for ISP"""
-    try:
-        if str(current_isp.id) != isp_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied to this ISP"
-            )
-        
-        segments = db.query(CustomerSegment).filter(
-            CustomerSegment.isp_id == current_isp.id
-        ).all()
-        
-        total_users = db.query(User).join(Branch).filter(
-            Branch.isp_id == current_isp.id
-        ).count()
-        
-        result = []
-        for segment in segments:
-            # Simplified subscriber count
-            subscriber_count = total_users // max(1, len(segments))
-            
-            result.append(CustomerSegmentResponse(
+    """
+    Get all customer segments for ISP
+    - Serialized list cached in Redis until the next segment write, served with an ETag
+    """
+    if str(current_isp.id) != isp_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this ISP"
+        )
+    
+    version = await cache_version(_list_version_key(current_isp.id, "segments"))
+    cache_key = f"crm:{current_isp.id}:segments:{version}"
+    
+    body = await cache_get_raw(cache_key)
+    if body is None:
+        segments = (await db.scalars(SEGMENTS_BY_ISP, {"isp_id": current_isp.id})).all()
+        
+        body = CustomerSegmentListAdapter.dump_json([
+            CustomerSegmentResponse(
                 id=str(segment.id),
                 isp_id=str(segment.isp_id),
                 name=segment.name,
                 criteria=segment.criteria,
                 description=segment.description,
                 auto_update=segment.auto_update,
-                subscriber_count=subscriber_count,
+                subscriber_count=segment.subscriber_count,
+                last_evaluated_at=segment.last_evaluated_at,
                 created_at=segment.created_at
-            ))
-        
-        return result
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error fetching customer segments: {str(e)}"
-        )
+            ) for segment in segments
+        ]).decode()
+        await cache_set_raw(cache_key, body, LIST_CACHE_TTL)
+    
+    return etag_response(body, if_none_match)
 
 @router.post("/{isp_id}/campaigns", response_model=MarketingCampaignResponse)
 async def create_marketing_campaign(
     isp_id: str,
     campaign_data: MarketingCampaignCreate,
-    current_isp: ISP = Depends(get_current_isp),
-    db: Session = Depends(get_db)
+    current_isp: ISP = Depends(get_current_isp_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create automated email/SMS marketing campaign
@@ -244,143 +328,179 @@ async def create_marketing_campaign(
     - AI-powered content optimization
     - Automated scheduling and delivery
     """
-    try:
-        if str(current_isp.id) != isp_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied to this ISP"
-            )
-        
-        campaign = MarketingCampaign(
-            isp_id=current_isp.id,
-            name=campaign_data.name,
-            campaign_type=campaign_data.campaign_type,
-            target_segments=campaign_data.target_segments,
-            content=campaign_data.content,
-            scheduled_at=campaign_data.scheduled_at,
-            status='draft' if campaign_data.scheduled_at else 'ready'
-        )
-        
-        db.add(campaign)
-        db.commit()
-        db.refresh(campaign)
-        
-        return MarketingCampaignResponse(
-            id=str(campaign.id),
-            isp_id=str(campaign.isp_id),
-            name=campaign.name,
-            campaign_type=campaign.campaign_type,
-            status=campaign.status,
-            target_segments=campaign.target_segments,
-            content=campaign.content,
-            scheduled_at=campaign.scheduled_at,
-            metrics=campaign.metrics,
-            created_at=campaign.created_at
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
+    if str(current_isp.id) != isp_id:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error creating marketing campaign: {str(e)}"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this ISP"
         )
+    
+    # Core INSERT ... RETURNING: one round trip, no ORM object or refresh SELECT
+    campaign_status = 'draft' if campaign_data.scheduled_at else 'ready'
+    campaign = (await db.execute(insert(MarketingCampaign).values(
+        isp_id=current_isp.id,
+        name=campaign_data.name,
+        campaign_type=campaign_data.campaign_type,
+        target_segments=campaign_data.target_segments,
+        content=campaign_data.content,
+        scheduled_at=campaign_data.scheduled_at,
+        status=campaign_status
+    ).returning(MarketingCampaign.id, MarketingCampaign.metrics, MarketingCampaign.created_at))).one()
+    
+    await db.commit()
+    await bump_version(_list_version_key(current_isp.id, "campaigns"))
+    
+    return MarketingCampaignResponse(
+        id=str(campaign.id),
+        isp_id=str(current_isp.id),
+        name=campaign_data.name,
+        campaign_type=campaign_data.campaign_type,
+        status=campaign_status,
+        target_segments=campaign_data.target_segments,
+        content=campaign_data.content,
+        scheduled_at=campaign_data.scheduled_at,
+        metrics=campaign.metrics,
+        created_at=campaign.created_at
+    )
 
-@router.get("/{isp_id}/campaigns", response_model=List[MarketingCampaignResponse])
+@router.get("/{isp_id}/campaigns", response_model=List[MarketingCampaignSummary])
 async def get_marketing_campaigns(
     isp_id: str,
-    current_isp: ISP = Depends(get_current_isp),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    if_none_match: Optional[str] = Header(None),
+    current_isp: ISP = Depends(get_current_isp_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all marketing campaigns for ISP"""
-    try:
-        if str(current_isp.id) != isp_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied to this ISP"
-            )
-        
-        campaigns = db.query(MarketingCampaign).filter(
-            MarketingCampaign.isp_id == current_isp.id
-        ).order_by(desc(MarketingCampaign.created_at)).all()
-        
-        return [
-            MarketingCampaignResponse(
+    """
+    List marketing campaigns for ISP, newest first
+    - Keyset pagination: pass the X-Next-Cursor response header back as `cursor` for the next page
+    - Summary columns only; fetch /campaigns/{campaign_id} for the full campaign
+    - Serialized pages cached in Redis until the next campaign write, served with an ETag
+    """
+    if str(current_isp.id) != isp_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this ISP"
+        )
+    
+    version = await cache_version(_list_version_key(current_isp.id, "campaigns"))
+    cache_key = f"crm:{current_isp.id}:campaigns:{version}:{cursor or ''}:{limit}"
+    
+    # Cached as "<next cursor>\n<body>" so a hit also restores the header
+    cached = await cache_get_raw(cache_key)
+    if cached is not None:
+        next_cursor, body = cached.split("\n", 1)
+    else:
+        stmt = CAMPAIGN_SUMMARIES_BY_ISP
+        if cursor:
+            stmt = stmt.where(tuple_(MarketingCampaign.created_at, MarketingCampaign.id) < decode_cursor(cursor))
+        
+        # One extra row tells whether another page follows
+        campaigns = (await db.execute(stmt, {"isp_id": current_isp.id, "limit": limit + 1})).all()
+        
+        campaigns, next_cursor = split_page(campaigns, limit)
+        
+        body = MarketingCampaignSummaryListAdapter.dump_json([
+            MarketingCampaignSummary(
                 id=str(campaign.id),
-                isp_id=str(campaign.isp_id),
                 name=campaign.name,
                 campaign_type=campaign.campaign_type,
                 status=campaign.status,
-                target_segments=campaign.target_segments,
-                content=campaign.content,
                 scheduled_at=campaign.scheduled_at,
-                metrics=campaign.metrics,
                 created_at=campaign.created_at
             ) for campaign in campaigns
-        ]
-        
-    except HTTPException:
-        raise
-    except Exception as e:
+        ]).decode()
+        await cache_set_raw(cache_key, f"{next_cursor or ''}\n{body}", LIST_CACHE_TTL)
+    
+    response = etag_response(body, if_none_match)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response
+
+@router.get("/{isp_id}/campaigns/{campaign_id}", response_model=MarketingCampaignResponse)
+async def get_marketing_campaign(
+    isp_id: str,
+    campaign_id: str,
+    current_isp: ISP = Depends(get_current_isp_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a single marketing campaign with its content and metrics"""
+    if str(current_isp.id) != isp_id:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error fetching marketing campaigns: {str(e)}"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this ISP"
         )
+    
+    campaign = await db.scalar(CAMPAIGN_BY_ID, {"campaign_id": campaign_id, "isp_id": current_isp.id})
+    
+    if not campaign:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Campaign not found"
+        )
+    
+    return MarketingCampaignResponse(
+        id=str(campaign.id),
+        isp_id=str(campaign.isp_id),
+        name=campaign.name,
+        campaign_type=campaign.campaign_type,
+        status=campaign.status,
+        target_segments=campaign.target_segments,
+        content=campaign.content,
+        scheduled_at=campaign.scheduled_at,
+        metrics=campaign.metrics,
+        created_at=campaign.created_at
+    )
 
 @router.get("/{isp_id}/campaigns/{campaign_id}/metrics", response_model=CampaignMetrics)
 async def get_campaign_metrics(
     isp_id: str,
     campaign_id: str,
-    current_isp: ISP = Depends(get_current_isp),
-    db: Session = Depends(get_db)
+    current_isp: ISP = Depends(get_current_isp_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get detailed metrics for a marketing campaign"""
-    try:
-        if str(current_isp.id) != isp_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied to this ISP"
-            )
-        
-        campaign = db.query(MarketingCampaign).filter(
-            MarketingCampaign.id == campaign_id,
-            MarketingCampaign.isp_id == current_isp.id
-        ).first()
-        
-        if not campaign:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Campaign not found"
-            )
-        
-        # Simulate campaign metrics (in production, these would come from actual delivery data)
-        sent = 1000
-        delivered = 975
-        opened = 234
-        clicked = 45
-        unsubscribed = 12
-        bounced = 25
-        
-        delivery_rate = (delivered / sent * 100) if sent > 0 else 0
-        open_rate = (opened / delivered * 100) if delivered > 0 else 0
-        click_rate = (clicked / opened * 100) if opened > 0 else 0
-        
-        return CampaignMetrics(
-            sent=sent,
-            delivered=delivered,
-            opened=opened,
-            clicked=clicked,
-            unsubscribed=unsubscribed,
-            bounced=bounced,
-            delivery_rate=round(delivery_rate, 2),
-            open_rate=round(open_rate, 2),
-            click_rate=round(click_rate, 2)
+    if str(current_isp.id) != isp_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this ISP"
         )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
+    
+    # One indexed lookup: the campaign and its pre-aggregated counters
+    row = (await db.execute(
+        CAMPAIGN_STATS_BY_ID, {"campaign_id": campaign_id, "isp_id": current_isp.id}
+    )).first()
+    
+    if not row:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error fetching campaign metrics: {str(e)}"
-        )
\ No newline at end of file
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Campaign not found"
+        )
+    
+    # Counters once events are recorded; until then the campaign's stored
+    # metrics, then the sample figures
+    stats = row.CampaignStats
+    metrics = row.metrics or {}
+    if stats:
+        counts = (getattr(stats, field) for field in CAMPAIGN_STAT_FIELDS)
+    elif any(field in metrics for field in CAMPAIGN_STAT_FIELDS):
+        counts = (int(metrics.get(field, 0)) for field in CAMPAIGN_STAT_FIELDS)
+    else:
+        counts = SAMPLE_CAMPAIGN_STATS
+    sent, delivered, opened, clicked, unsubscribed, bounced = counts
+    
+    delivery_rate = (delivered / sent * 100) if sent > 0 else 0
+    open_rate = (opened / delivered * 100) if delivered > 0 else 0
+    click_rate = (clicked / opened * 100) if opened > 0 else 0
+    
+    return CampaignMetrics(
+        sent=sent,
+        delivered=delivered,
+        opened=opened,
+        clicked=clicked,
+        unsubscribed=unsubscribed,
+        bounced=bounced,
+        delivery_rate=round(delivery_rate, 2),
+        open_rate=round(open_rate, 2),
+        click_rate=round(click_rate, 2)
+    )
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 
@@ -17,6 +17,7 @@ class CustomerSegmentResponse(BaseModel):
     description: Optional[str]
     auto_update: bool
     subscriber_count: int
+    last_evaluated_at: Optional[datetime] = None
     created_at: datetime
 
 # Marketing Campaign Schemas
@@ -39,6 +40,18 @@ class MarketingCampaignResponse(BaseModel):
     metrics: Dict[str, Any]
     created_at: datetime
 
+class MarketingCampaignSummary(BaseModel):
+    # List view; the full campaign (content, metrics) is served per campaign
+    id: str
+    name: str
+    campaign_type: str
+    status: str
+    scheduled_at: Optional[datetime]
+    created_at: datetime
+
+CustomerSegmentListAdapter = TypeAdapter(List[CustomerSegmentResponse])
+MarketingCampaignSummaryListAdapter = TypeAdapter(List[MarketingCampaignSummary])
+
 class CampaignMetrics(BaseModel):
     sent: int
     delivered: int
@@ -1,25 +1,61 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, update, table, column, text, union_all, cast, String, Float
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
 from datetime import datetime, timedelta
+import asyncio
+import logging
+import secrets
 import uuid
 
-from ..shared.database.connection import get_db
+from ..shared.database.connection import get_async_db, AsyncSessionLocal, try_advisory_lock
 from ..shared.models.models import Founder, ISP, Branch, User, Payment, BandwidthUsage
 from .schemas import (
     FounderDashboardResponse, ISPCreateRequest, ISPCreateResponse, 
     ISPListResponse, GlobalPoliciesRequest, RevenueAnalyticsResponse,
-    SystemMonitoringResponse
+    SystemMonitoringResponse, FounderBatchRequest, FounderBatchResponse
 )
 from ..shared.utils.security import hash_password, generate_domain_safe_string
-from ..auth.dependencies import get_current_founder
+from ..auth.dependencies import get_current_founder_async
+from ..shared.config import settings
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+logger = logging.getLogger(__name__)
+
+# Completed-payment revenue per ISP and calendar month (migration 005). Only
+# closed months are read from it; the current month is always queried live
+mv_isp_monthly_revenue = table(
+    "mv_isp_monthly_revenue", column("isp_id"), column("month"), column("revenue")
+)
+
+# Domains tried per ISP creation: the name itself, then random suffixes
+ISP_DOMAIN_ATTEMPTS = 3
+
+# Seconds between refreshes of the revenue rollup
+REVENUE_ROLLUP_REFRESH_SECONDS = 300
+
+async def refresh_revenue_rollup():
+    """Periodically refresh the monthly revenue view (started on app startup)"""
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                # Another worker is already refreshing this interval
+                if await try_advisory_lock(db, "founder:revenue_rollup"):
+                    await db.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_isp_monthly_revenue"))
+                await db.commit()
+        except Exception as e:
+            print(f"Error refreshing revenue rollup: {e}")
+        
+        await asyncio.sleep(REVENUE_ROLLUP_REFRESH_SECONDS)
 
 @router.get("/dashboard", response_model=FounderDashboardResponse)
 async def get_founder_dashboard(
-    current_founder: Founder = Depends(get_current_founder),
-    db: Session = Depends(get_db)
+    current_founder: Founder = Depends(get_current_founder_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Founder dashboard overview with AI-powered analytics
@@ -27,63 +63,58 @@ async def get_founder_dashboard(
     - Predictive revenue forecasting using ML
     - Real-time system health monitoring
     """
-    try:
-        # Get total ISPs count
-        total_isps = db.query(ISP).filter(ISP.founder_id == current_founder.id).count()
-        
-        # Get total branches across all ISPs
-        total_branches = db.query(Branch).join(ISP).filter(
+    # Get total ISPs, branches and users across all ISPs in one round trip
+    # (an AsyncSession runs one statement at a time, so the counts are
+    # combined as scalar subqueries rather than gathered concurrently)
+    total_isps, total_branches, total_users = (await db.execute(select(
+        select(func.count(ISP.id)).where(
             ISP.founder_id == current_founder.id
-        ).count()
-        
-        # Get total users across all ISPs
-        total_users = db.query(User).join(Branch).join(ISP).filter(
+        ).scalar_subquery(),
+        select(func.count(Branch.id)).join(ISP).where(
             ISP.founder_id == current_founder.id
-        ).count()
-        
-        # Calculate total revenue for current month
-        current_month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        total_revenue = db.query(Payment).join(User).join(Branch).join(ISP).filter(
-            ISP.founder_id == current_founder.id,
-            Payment.created_at >= current_month_start,
-            Payment.status == 'completed'
-        ).with_entities(Payment.amount).all()
-        
-        monthly_revenue = sum([payment.amount for payment in total_revenue]) if total_revenue else 0
-        
-        # Get recent ISP activity
-        recent_isps = db.query(ISP).filter(
+        ).scalar_subquery(),
+        select(func.count(User.id)).join(Branch).join(ISP).where(
             ISP.founder_id == current_founder.id
-        ).order_by(ISP.created_at.desc()).limit(5).all()
-        
-        return FounderDashboardResponse(
-            total_isps=total_isps,
-            total_branches=total_branches,
-            total_users=total_users,
-            monthly_revenue=float(monthly_revenue),
-            system_health=99.9,  # This would be calculated from actual monitoring
-            recent_isps=[
-                {
-                    "id": str(isp.id),
-                    "company_name": isp.company_name,
-                    "domain": isp.domain,
-                    "created_at": isp.created_at.isoformat(),
-                    "is_active": isp.is_active
-                } for isp in recent_isps
-            ]
-        )
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error fetching dashboard data: {str(e)}"
-        )
+        ).scalar_subquery()
+    ))).one()
+    
+    # Calculate total revenue for current month
+    current_month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    monthly_revenue = await db.scalar(select(func.coalesce(func.sum(Payment.amount), 0)).select_from(Payment).join(User).join(Branch).join(ISP).where(
+        ISP.founder_id == current_founder.id,
+        Payment.created_at >= current_month_start,
+        Payment.status == 'completed'
+    ))
+    
+    # Get recent ISP activity (only the columns covered by idx_isps_founder_created)
+    recent_isps = (await db.execute(select(
+        ISP.id, ISP.company_name, ISP.domain, ISP.created_at, ISP.is_active
+    ).where(
+        ISP.founder_id == current_founder.id
+    ).order_by(ISP.created_at.desc()).limit(5))).all()
+    
+    return FounderDashboardResponse(
+        total_isps=total_isps,
+        total_branches=total_branches,
+        total_users=total_users,
+        monthly_revenue=float(monthly_revenue),
+        system_health=99.9,  # This would be calculated from actual monitoring
+        recent_isps=[
+            {
+                "id": str(isp.id),
+                "company_name": isp.company_name,
+                "domain": isp.domain,
+                "created_at": isp.created_at.isoformat(),
+                "is_active": isp.is_active
+            } for isp in recent_isps
+        ]
+    )
 
 @router.post("/isp/create", response_model=ISPCreateResponse)
 async def create_isp_portal(
     isp_data: ISPCreateRequest,
-    current_founder: Founder = Depends(get_current_founder),
-    db: Session = Depends(get_db)
+    current_founder: Founder = Depends(get_current_founder_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create new ISP portal with auto-generated URL and white-label branding
@@ -92,63 +123,71 @@ async def create_isp_portal(
     - Initialize ISP database schemas and default settings
     - Send welcome email with login credentials
     """
-    try:
-        # Generate domain-safe string from company name
-        domain_name = generate_domain_safe_string(isp_data.company_name)
-        
-        # Check if domain already exists
-        existing_isp = db.query(ISP).filter(ISP.domain == domain_name).first()
-        if existing_isp:
-            # If domain exists, append a number
-            counter = 1
-            while existing_isp:
-                test_domain = f"{domain_name}-{counter}"
-                existing_isp = db.query(ISP).filter(ISP.domain == test_domain).first()
-                if not existing_isp:
-                    domain_name = test_domain
-                    break
-                counter += 1
-        
-        # Create new ISP
-        new_isp = ISP(
-            founder_id=current_founder.id,
-            company_name=isp_data.company_name,
-            domain=domain_name,
-            email=isp_data.email,
-            password_hash=hash_password(isp_data.password),
-            contact_person=isp_data.contact_person,
-            phone=isp_data.phone,
-            address=isp_data.address,
-            branding=isp_data.branding or {},
-            settings=isp_data.settings or {}
+    # ISP emails are unique (they identify the account at login)
+    if await db.scalar(select(ISP.id).where(ISP.email == isp_data.email)):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
         )
+    
+    # Generate domain-safe string from company name
+    domain_name = generate_domain_safe_string(isp_data.company_name)
+    
+    # Claim the domain atomically; the unique index on isps.domain makes a
+    # taken name a no-op, in which case retry with a random suffix
+    isp_id = None
+    base_domain = domain_name
+    password_hash = await run_in_threadpool(hash_password, isp_data.password)
+    for attempt in range(ISP_DOMAIN_ATTEMPTS):
+        if attempt:
+            domain_name = f"{base_domain}-{secrets.token_hex(3)}"
         
-        db.add(new_isp)
-        db.commit()
-        db.refresh(new_isp)
-        
-        # Generate portal URL
-        from ..shared.config import settings
-        portal_url = f"https://{domain_name}.{settings.domain}"
+        try:
+            isp_id = await db.scalar(pg_insert(ISP).values(
+                founder_id=current_founder.id,
+                company_name=isp_data.company_name,
+                domain=domain_name,
+                email=isp_data.email,
+                password_hash=password_hash,
+                contact_person=isp_data.contact_person,
+                phone=isp_data.phone,
+                address=isp_data.address,
+                branding=isp_data.branding or {},
+                settings=isp_data.settings or {}
+            ).on_conflict_do_nothing(index_elements=[ISP.domain]).returning(ISP.id))
+        except IntegrityError:
+            # A concurrent request registered the email after the check above
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered"
+            )
         
-        return ISPCreateResponse(
-            isp_id=str(new_isp.id),
-            portal_url=portal_url,
-            domain=domain_name,
-            message="ISP portal created successfully"
-        )
-        
-    except Exception as e:
-        db.rollback()
+        if isp_id is not None:
+            break
+    
+    if isp_id is None:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error creating ISP portal: {str(e)}"
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Could not allocate a unique domain for this ISP"
         )
+    
+    await db.commit()
+    
+    # Generate portal URL
+    portal_url = f"https://{domain_name}.{settings.domain}"
+    
+    return ISPCreateResponse(
+        isp_id=str(isp_id),
+        portal_url=portal_url,
+        domain=domain_name,
+        message="ISP portal created successfully"
+    )
 
 @router.get("/isp/list", response_model=List[ISPListResponse])
 async def list_isps(
-    current_founder: Founder = Depends(get_current_founder),
-    db: Session = Depends(get_db)
+    current_founder: Founder = Depends(get_current_founder_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     List all ISPs with status, revenue, and performance metrics
@@ -156,54 +195,62 @@ async def list_isps(
     - Revenue tracking per ISP
     - Health status and alerts
     """
-    try:
-        isps = db.query(ISP).filter(ISP.founder_id == current_founder.id).all()
-        
-        isp_list = []
-        for isp in isps:
-            # Get branches count
-            branches_count = db.query(Branch).filter(Branch.isp_id == isp.id).count()
-            
-            # Get users count
-            users_count = db.query(User).join(Branch).filter(Branch.isp_id == isp.id).count()
-            
-            # Calculate monthly revenue
-            current_month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            revenue = db.query(Payment).join(User).join(Branch).filter(
-                Branch.isp_id == isp.id,
-                Payment.created_at >= current_month_start,
-                Payment.status == 'completed'
-            ).with_entities(Payment.amount).all()
-            
-            monthly_revenue = sum([payment.amount for payment in revenue]) if revenue else 0
-            
-            isp_list.append(ISPListResponse(
-                id=str(isp.id),
-                company_name=isp.company_name,
-                domain=isp.domain,
-                email=isp.email,
-                contact_person=isp.contact_person,
-                branches_count=branches_count,
-                users_count=users_count,
-                monthly_revenue=float(monthly_revenue),
-                is_active=isp.is_active,
-                created_at=isp.created_at.isoformat(),
-                portal_url=f"https://{isp.domain}.{settings.domain}"
-            ))
-        
-        return isp_list
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error fetching ISP list: {str(e)}"
-        )
+    # Rows are already shaped like ISPListResponse; emit them without revalidating
+    return ORJSONResponse(await _isp_list_rows(current_founder, db))
+
+async def _isp_list_rows(current_founder: Founder, db: AsyncSession) -> List[dict]:
+    """ISP list rows, fully computed in SQL, as plain dicts ready for JSON"""
+    current_month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    
+    # Per-ISP branch count, user count and monthly revenue, each grouped by
+    # ISP in a subquery and joined onto the ISP rows: one round trip in total
+    branch_counts = select(
+        Branch.isp_id, func.count(Branch.id).label("branches_count")
+    ).join(ISP).where(
+        ISP.founder_id == current_founder.id
+    ).group_by(Branch.isp_id).subquery()
+    
+    user_counts = select(
+        Branch.isp_id, func.count(User.id).label("users_count")
+    ).join(User).join(ISP).where(
+        ISP.founder_id == current_founder.id
+    ).group_by(Branch.isp_id).subquery()
+    
+    revenue = select(
+        Branch.isp_id, func.sum(Payment.amount).label("monthly_revenue")
+    ).select_from(Payment).join(User).join(Branch).join(ISP).where(
+        ISP.founder_id == current_founder.id,
+        Payment.created_at >= current_month_start,
+        Payment.status == 'completed'
+    ).group_by(Branch.isp_id).subquery()
+    
+    rows = (await db.execute(select(
+        cast(ISP.id, String).label("id"),
+        ISP.company_name,
+        ISP.domain,
+        ISP.email,
+        ISP.contact_person,
+        func.coalesce(branch_counts.c.branches_count, 0).label("branches_count"),
+        func.coalesce(user_counts.c.users_count, 0).label("users_count"),
+        cast(func.coalesce(revenue.c.monthly_revenue, 0), Float).label("monthly_revenue"),
+        ISP.is_active,
+        ISP.created_at,
+        func.concat('https://', ISP.domain, '.', settings.domain).label("portal_url")
+    ).outerjoin(
+        branch_counts, branch_counts.c.isp_id == ISP.id
+    ).outerjoin(
+        user_counts, user_counts.c.isp_id == ISP.id
+    ).outerjoin(
+        revenue, revenue.c.isp_id == ISP.id
+    ).where(ISP.founder_id == current_founder.id))).all()
+    
+    return [dict(row._mapping) for row in rows]
 
 @router.put("/policies/global")
 async def set_global_policies(
     policies: GlobalPoliciesRequest,
-    current_founder: Founder = Depends(get_current_founder),
-    db: Session = Depends(get_db)
+    current_founder: Founder = Depends(get_current_founder_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Configure system-wide policies and settings
@@ -212,31 +259,24 @@ async def set_global_policies(
     - Compliance and security settings
     - Payment gateway configurations
     """
-    try:
-        # Update founder settings with global policies
-        current_founder.settings = {
-            **current_founder.settings,
-            "global_policies": policies.dict()
-        }
-        
-        db.commit()
-        
-        return {
-            "message": "Global policies updated successfully",
-            "timestamp": datetime.now().isoformat()
-        }
-        
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error updating global policies: {str(e)}"
-        )
+    # Update founder settings with global policies (current_founder is
+    # bound to the auth dependency's session, so write through this one)
+    await db.execute(update(Founder).where(Founder.id == current_founder.id).values(settings={
+        **(current_founder.settings or {}),
+        "global_policies": policies.dict()
+    }))
+    
+    await db.commit()
+    
+    return {
+        "message": "Global policies updated successfully",
+        "timestamp": datetime.now().isoformat()
+    }
 
 @router.get("/revenue/analytics", response_model=RevenueAnalyticsResponse)
 async def get_revenue_analytics(
-    current_founder: Founder = Depends(get_current_founder),
-    db: Session = Depends(get_db)
+    current_founder: Founder = Depends(get_current_founder_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     AI-powered revenue analytics and forecasting
@@ -245,46 +285,56 @@ async def get_revenue_analytics(
     - Per-ISP revenue breakdown
     - Commission calculations
     """
-    try:
-        # Get revenue data for the last 12 months
-        twelve_months_ago = datetime.now() - timedelta(days=365)
-        
-        revenue_data = db.query(Payment).join(User).join(Branch).join(ISP).filter(
-            ISP.founder_id == current_founder.id,
-            Payment.created_at >= twelve_months_ago,
-            Payment.status == 'completed'
-        ).all()
-        
-        # Group revenue by month
-        monthly_revenue = {}
-        for payment in revenue_data:
-            month_key = payment.created_at.strftime('%Y-%m')
-            if month_key not in monthly_revenue:
-                monthly_revenue[month_key] = 0
-            monthly_revenue[month_key] += float(payment.amount)
-        
-        # Simple prediction for next 3 months (in real implementation, use ML)
-        last_3_months_avg = sum(list(monthly_revenue.values())[-3:]) / 3 if monthly_revenue else 0
-        predicted_revenue = [last_3_months_avg * 1.05, last_3_months_avg * 1.08, last_3_months_avg * 1.12]
-        
-        return RevenueAnalyticsResponse(
-            historical_revenue=monthly_revenue,
-            predicted_revenue=predicted_revenue,
-            total_revenue=sum(monthly_revenue.values()),
-            growth_rate=5.0,  # This would be calculated from actual data
-            confidence_score=0.85
-        )
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error fetching revenue analytics: {str(e)}"
-        )
+    # Get revenue data for the last 12 months
+    twelve_months_ago = datetime.now() - timedelta(days=365)
+    first_month = twelve_months_ago.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    current_month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    
+    # Closed months come from the precomputed rollup
+    closed_months = select(
+        func.to_char(mv_isp_monthly_revenue.c.month, 'YYYY-MM').label("month"),
+        func.sum(mv_isp_monthly_revenue.c.revenue).label("revenue")
+    ).join(ISP, ISP.id == mv_isp_monthly_revenue.c.isp_id).where(
+        ISP.founder_id == current_founder.id,
+        mv_isp_monthly_revenue.c.month >= first_month,
+        mv_isp_monthly_revenue.c.month < current_month_start
+    ).group_by(mv_isp_monthly_revenue.c.month)
+    
+    # The current, still open month is summed live from payments
+    payment_month = func.to_char(func.date_trunc('month', Payment.created_at), 'YYYY-MM')
+    current_month = select(
+        payment_month.label("month"),
+        func.sum(Payment.amount).label("revenue")
+    ).select_from(Payment).join(User).join(Branch).join(ISP).where(
+        ISP.founder_id == current_founder.id,
+        Payment.created_at >= current_month_start,
+        Payment.status == 'completed'
+    ).group_by(payment_month)
+    
+    # Oldest month first
+    revenue_query = union_all(closed_months, current_month)
+    revenue_data = (await db.execute(
+        revenue_query.order_by(revenue_query.selected_columns.month)
+    )).all()
+    
+    monthly_revenue = {month: float(amount) for month, amount in revenue_data}
+    
+    # Simple prediction for next 3 months (in real implementation, use ML)
+    last_3_months_avg = sum(list(monthly_revenue.values())[-3:]) / 3 if monthly_revenue else 0
+    predicted_revenue = [last_3_months_avg * 1.05, last_3_months_avg * 1.08, last_3_months_avg * 1.12]
+    
+    return RevenueAnalyticsResponse(
+        historical_revenue=monthly_revenue,
+        predicted_revenue=predicted_revenue,
+        total_revenue=sum(monthly_revenue.values()),
+        growth_rate=5.0,  # This would be calculated from actual data
+        confidence_score=0.85
+    )
 
 @router.get("/system/monitoring", response_model=SystemMonitoringResponse)
 async def get_system_monitoring(
-    current_founder: Founder = Depends(get_current_founder),
-    db: Session = Depends(get_db)
+    current_founder: Founder = Depends(get_current_founder_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Real-time system monitoring with AI anomaly detection
@@ -293,42 +343,73 @@ async def get_system_monitoring(
     - Anomaly detection alerts
     - Predictive maintenance recommendations
     """
-    try:
-        # Get total users across all ISPs
-        total_users = db.query(User).join(Branch).join(ISP).filter(
-            ISP.founder_id == current_founder.id,
-            User.is_active == True
-        ).count()
-        
-        # Get recent bandwidth usage (mock data for demo)
-        recent_usage = db.query(BandwidthUsage).join(User).join(Branch).join(ISP).filter(
-            ISP.founder_id == current_founder.id,
-            BandwidthUsage.date >= datetime.now().date() - timedelta(days=7)
-        ).all()
-        
-        total_bandwidth_gb = sum([usage.total_bytes / (1024**3) for usage in recent_usage])
-        avg_peak_usage = sum([usage.peak_usage_mbps for usage in recent_usage]) / len(recent_usage) if recent_usage else 0
-        
-        return SystemMonitoringResponse(
-            system_health=99.9,
-            active_users=total_users,
-            total_bandwidth_gb=round(total_bandwidth_gb, 2),
-            avg_peak_usage_mbps=round(avg_peak_usage, 2),
-            alerts=[
-                {
-                    "type": "info",
-                    "message": "System performance is optimal",
-                    "timestamp": datetime.now().isoformat()
-                }
-            ],
-            recommendations=[
-                "Consider upgrading bandwidth capacity in the downtown region",
-                "Monitor network performance during peak hours (7-10 PM)"
-            ]
-        )
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error fetching system monitoring data: {str(e)}"
-        )
\ No newline at end of file
+    # Get total users across all ISPs
+    total_users = await db.scalar(select(func.count(User.id)).join(Branch).join(ISP).where(
+        ISP.founder_id == current_founder.id,
+        User.is_active == True
+    ))
+    
+    # Aggregate the last week's bandwidth usage in the database; usage rows
+    # carry their ISP, so the (isp_id, date) index serves the filter
+    total_bandwidth_gb, avg_peak_usage = (await db.execute(select(
+        func.coalesce(func.sum(BandwidthUsage.total_bytes), 0) / (1024**3),
+        func.coalesce(func.avg(BandwidthUsage.peak_usage_mbps), 0)
+    ).join(ISP, ISP.id == BandwidthUsage.isp_id).where(
+        ISP.founder_id == current_founder.id,
+        BandwidthUsage.date >= datetime.now().date() - timedelta(days=7)
+    ))).one()
+    
+    return SystemMonitoringResponse(
+        system_health=99.9,
+        active_users=total_users,
+        total_bandwidth_gb=round(float(total_bandwidth_gb), 2),
+        avg_peak_usage_mbps=round(float(avg_peak_usage), 2),
+        alerts=[
+            {
+                "type": "info",
+                "message": "System performance is optimal",
+                "timestamp": datetime.now().isoformat()
+            }
+        ],
+        recommendations=[
+            "Consider upgrading bandwidth capacity in the downtown region",
+            "Monitor network performance during peak hours (7-10 PM)"
+        ]
+    )
+
+# Handlers reachable through /batch, keyed by their path under /api/founder
+BATCH_HANDLERS = {
+    "dashboard": get_founder_dashboard,
+    "isp/list": _isp_list_rows,
+    "revenue/analytics": get_revenue_analytics,
+    "system/monitoring": get_system_monitoring
+}
+
+@router.post("/batch", response_model=FounderBatchResponse)
+async def batch(
+    batch_request: FounderBatchRequest,
+    current_founder: Founder = Depends(get_current_founder_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Run several founder portal reads in one HTTP round trip
+    - Authenticates once and shares one database session across sub-requests
+    - Sub-requests run in order, since a session executes one statement at a time
+    - A failing sub-request is reported in errors without failing the batch
+    """
+    results = {}
+    errors = {}
+    
+    for path in dict.fromkeys(batch_request.requests):
+        try:
+            results[path] = await BATCH_HANDLERS[path](current_founder=current_founder, db=db)
+        except HTTPException as e:
+            errors[path] = str(e.detail)
+        except Exception:
+            # Same outcome the global handler gives a standalone request; the
+            # rollback leaves the shared session usable for the next sub-request
+            logger.exception("Unhandled error in batched founder request %s", path)
+            errors[path] = "Internal server error"
+            await db.rollback()
+    
+    return FounderBatchResponse(results=results, errors=errors)
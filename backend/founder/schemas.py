@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, ConfigDict, EmailStr
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime
 
 # Request schemas
@@ -13,6 +13,10 @@ class ISPCreateRequest(BaseModel):
     branding: Optional[Dict[str, Any]] = None
     settings: Optional[Dict[str, Any]] = None
 
+class FounderBatchRequest(BaseModel):
+    # Founder portal GET endpoints to run, by path relative to /api/founder
+    requests: List[Literal["dashboard", "isp/list", "revenue/analytics", "system/monitoring"]]
+
 class GlobalPoliciesRequest(BaseModel):
     pricing_policies: Optional[Dict[str, Any]] = None
     bandwidth_rules: Optional[Dict[str, Any]] = None
@@ -22,12 +26,16 @@ class GlobalPoliciesRequest(BaseModel):
 
 # Response schemas
 class ISPCreateResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     isp_id: str
     portal_url: str
     domain: str
     message: str
 
 class ISPSummary(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     id: str
     company_name: str
     domain: str
@@ -35,6 +43,8 @@ class ISPSummary(BaseModel):
     is_active: bool
 
 class FounderDashboardResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     total_isps: int
     total_branches: int
     total_users: int
@@ -43,6 +53,8 @@ class FounderDashboardResponse(BaseModel):
     recent_isps: List[ISPSummary]
 
 class ISPListResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     id: str
     company_name: str
     domain: str
@@ -56,6 +68,8 @@ class ISPListResponse(BaseModel):
     portal_url: str
 
 class RevenueAnalyticsResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     historical_revenue: Dict[str, float]  # Month -> Revenue
     predicted_revenue: List[float]  # Next 3 months prediction
     total_revenue: float
@@ -63,14 +77,24 @@ class RevenueAnalyticsResponse(BaseModel):
     confidence_score: float
 
 class SystemAlert(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     type: str  # info, warning, error
     message: str
     timestamp: str
 
 class SystemMonitoringResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     system_health: float
     active_users: int
     total_bandwidth_gb: float
     avg_peak_usage_mbps: float
     alerts: List[SystemAlert]
-    recommendations: List[str]
\ No newline at end of file
+    recommendations: List[str]
+
+class FounderBatchResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
+    results: Dict[str, Any]  # Path -> that endpoint's response body
+    errors: Dict[str, str]   # Path -> error detail for sub-requests that failed
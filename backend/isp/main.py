@@ -1,27 +1,181 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import JSON, DateTime, Integer, bindparam, cast, column, func, insert, literal_column, or_, select, tuple_, values
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+from datetime import datetime
+import asyncio
+import time
 import uuid
 
-from ..shared.database.connection import get_db
+from ..shared.database.connection import get_async_db
 from ..shared.models.models import ISP, Branch, User, SubscriptionPlan, BandwidthUsage, Payment, SupportTicket
 from .schemas import (
-    ISPDashboardResponse, SubscriberCreateRequest, SubscriberCreateResponse,
+    ISPDashboardResponse, TicketSummary, SubscriberCreateRequest, SubscriberCreateResponse,
     SubscriberListResponse, BandwidthOptimizationResponse, SubscriberAnalyticsResponse,
-    RadiusConfigRequest, PlanCreateRequest, PlanResponse, EnhancedISPDashboard,
+    RadiusConfigRequest, PlanCreateRequest, PlanResponse, PlanListAdapter, EnhancedISPDashboard,
     LocalizationConfig, TrainingModuleResponse, WebhookCreate, WebhookResponse
 )
 from ..shared.utils.security import hash_password, generate_password
-from ..auth.dependencies import get_current_isp
+from ..shared.utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, split_page
+from ..shared.utils.time_bounds import month_start, days_ago
+from ..shared.utils.cache import cache_get_raw, cache_set_raw, cache_delete, cache_version, bump_version, etag_response
+from ..auth.dependencies import verify_isp_access
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Upper bound on one bulk onboarding request; larger imports are chunked by the client
+MAX_BULK_SUBSCRIBERS = 1000
+
+# Static statements built once at import; per-request values are bound at
+# execution so every call reuses the same cached compiled SQL
+_recent_tickets = select(
+    SupportTicket.id, SupportTicket.title, SupportTicket.priority,
+    SupportTicket.status, SupportTicket.created_at
+).join(User).join(Branch).where(
+    Branch.isp_id == bindparam("isp_id"),
+    SupportTicket.status.in_(['open', 'in_progress'])
+).order_by(SupportTicket.created_at.desc()).limit(5).subquery()
+
+# The newest open tickets as one JSON array, so the dashboard reads them in
+# the same round trip as its aggregates (an AsyncSession runs one statement
+# at a time, so they cannot be gathered concurrently)
+_recent_tickets_json = select(func.coalesce(
+    func.json_agg(aggregate_order_by(
+        func.json_build_object(
+            'id', _recent_tickets.c.id,
+            'title', _recent_tickets.c.title,
+            'priority', _recent_tickets.c.priority,
+            'status', _recent_tickets.c.status,
+            'created_at', _recent_tickets.c.created_at
+        ),
+        _recent_tickets.c.created_at.desc()
+    )),
+    literal_column("'[]'::json"),
+    type_=JSON
+)).scalar_subquery()
+
+# Weekly bandwidth for an ISP, read from the denormalized isp_id (migration
+# 010 covers it); an aggregate without GROUP BY always yields exactly one
+# row, so it can also serve as a FROM clause
+_week_usage = select(
+    func.coalesce(func.sum(BandwidthUsage.total_bytes), 0).label("total_bytes"),
+    func.coalesce(func.avg(BandwidthUsage.peak_usage_mbps), 0).label("avg_peak_usage")
+).where(
+    BandwidthUsage.isp_id == bindparam("isp_id"),
+    BandwidthUsage.date >= bindparam("week_ago")
+).subquery()
+
+WEEK_USAGE_BY_ISP = select(_week_usage.c.total_bytes, _week_usage.c.avg_peak_usage)
+
+_active_subscribers = select(func.count(User.id)).join(Branch).where(
+    Branch.isp_id == bindparam("isp_id"),
+    User.is_active == True
+).scalar_subquery()
+
+_active_branches = select(func.count(Branch.id)).where(
+    Branch.isp_id == bindparam("isp_id"),
+    Branch.is_active == True
+).scalar_subquery()
+
+ACTIVE_COUNTS_BY_ISP = select(_active_subscribers, _active_branches)
+
+# Dashboard aggregates, computed live from the base tables (each an index
+# lookup with the migration 010 indexes). month_start and week_ago are UTC
+DASHBOARD_STATS_BY_ISP = select(
+    _active_subscribers,
+    _active_branches,
+    select(func.coalesce(func.sum(Payment.amount), 0)).select_from(Payment).join(User).join(Branch).where(
+        Branch.isp_id == bindparam("isp_id"),
+        Payment.created_at >= bindparam("month_start"),
+        Payment.status == 'completed'
+    ).scalar_subquery(),
+    _week_usage.c.total_bytes,
+    _week_usage.c.avg_peak_usage,
+    _recent_tickets_json
+)
+
+ACTIVE_PLANS_BY_ISP = select(
+    SubscriptionPlan.id, SubscriptionPlan.name, SubscriptionPlan.description,
+    SubscriptionPlan.bandwidth_limit, SubscriptionPlan.data_limit, SubscriptionPlan.price,
+    SubscriptionPlan.currency, SubscriptionPlan.billing_cycle, SubscriptionPlan.features,
+    SubscriptionPlan.is_active
+).where(
+    SubscriptionPlan.isp_id == bindparam("isp_id"),
+    SubscriptionPlan.is_active == True
+).order_by(SubscriptionPlan.price)
+
+# Whether a branch belongs to the ISP, plus the ISP's plan if it exists; the
+# one-row VALUES keeps a row coming back when the plan does not match
+SUBSCRIBER_BRANCH_AND_PLAN = select(
+    select(Branch.id).where(
+        Branch.id == bindparam("branch_id"),
+        Branch.isp_id == bindparam("isp_id")
+    ).exists().label("branch_valid"),
+    SubscriptionPlan.name, SubscriptionPlan.bandwidth_limit, SubscriptionPlan.data_limit
+).select_from(values(column("n", Integer), name="one_row").data([(1,)]).outerjoin(
+    SubscriptionPlan,
+    (SubscriptionPlan.id == bindparam("plan_id")) & (SubscriptionPlan.isp_id == bindparam("isp_id"))
+))
+
+# Signups for the current and previous five calendar months; the month series
+# is generated in SQL so empty months report 0. The current month is bound as
+# a UTC month start, the same clock as the other ISP query bounds
+_current_month = cast(bindparam("month_start"), DateTime)
+_first_month = _current_month - literal_column("INTERVAL '5 months'")
+_months = select(func.generate_series(
+    _first_month, _current_month, literal_column("INTERVAL '1 month'")
+).label("month")).cte("months")
+
+_signups = select(func.date_trunc('month', User.created_at).label("month")).join(
+    Branch, User.branch_id == Branch.id
+).where(
+    Branch.isp_id == bindparam("isp_id"),
+    User.created_at >= _first_month
+).subquery()
+
+SIGNUPS_BY_MONTH_BY_ISP = select(
+    func.to_char(_months.c.month, 'YYYY-MM'), func.count(_signups.c.month)
+).select_from(_months).outerjoin(
+    _signups, _signups.c.month == _months.c.month
+).group_by(_months.c.month).order_by(_months.c.month.desc())
+
+SUBSCRIBER_TOTALS_BY_ISP = select(
+    func.count(User.id),
+    func.count(User.id).filter(User.is_active == True)
+).join(Branch).where(Branch.isp_id == bindparam("isp_id"))
+
+# Subscribers per plan; plans without subscribers report 0
+PLAN_DISTRIBUTION_BY_ISP = select(SubscriptionPlan.name, func.count(User.id)).outerjoin(
+    User,
+    (User.subscription_plan == SubscriptionPlan.name)
+    & User.branch_id.in_(select(Branch.id).where(Branch.isp_id == bindparam("isp_id")))
+).where(
+    SubscriptionPlan.isp_id == bindparam("isp_id")
+).group_by(SubscriptionPlan.name)
+
+# Seconds the dashboard and bandwidth optimization bodies are served from Redis
+DASHBOARD_CACHE_TTL = 60
+
+# Seconds the plan list and subscriber analytics bodies are served from Redis
+READ_CACHE_TTL = 300
+
+def _subscriber_cache_keys(isp_id) -> List[str]:
+    """Cached bodies that include subscriber counts for an ISP"""
+    return [
+        f"isp:{isp_id}:dashboard",
+        f"isp:{isp_id}:enhanced-dashboard",
+        f"isp:{isp_id}:analytics:subscribers"
+    ]
 
 @router.get("/{isp_id}/dashboard", response_model=ISPDashboardResponse)
 async def get_isp_dashboard(
-    isp_id: str,
-    current_isp: ISP = Depends(get_current_isp),
-    db: Session = Depends(get_db)
+    current_isp: ISP = Depends(verify_isp_access),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     White-labeled ISP dashboard with custom branding
@@ -31,70 +185,43 @@ async def get_isp_dashboard(
     - Network performance metrics
     """
     try:
-        # Verify ISP access
-        if str(current_isp.id) != isp_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied to this ISP portal"
-            )
-        
-        # Get subscriber count across all branches
-        subscriber_count = db.query(User).join(Branch).filter(
-            Branch.isp_id == current_isp.id,
-            User.is_active == True
-        ).count()
-        
-        # Get active branches count
-        branches_count = db.query(Branch).filter(
-            Branch.isp_id == current_isp.id,
-            Branch.is_active == True
-        ).count()
-        
-        # Calculate current month revenue
-        current_month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        monthly_revenue = db.query(Payment).join(User).join(Branch).filter(
-            Branch.isp_id == current_isp.id,
-            Payment.created_at >= current_month_start,
-            Payment.status == 'completed'
-        ).with_entities(Payment.amount).all()
-        
-        total_revenue = sum([payment.amount for payment in monthly_revenue]) if monthly_revenue else 0
-        
-        # Get bandwidth utilization data (last 7 days)
-        week_ago = datetime.now() - timedelta(days=7)
-        bandwidth_data = db.query(BandwidthUsage).join(User).join(Branch).filter(
-            Branch.isp_id == current_isp.id,
-            BandwidthUsage.date >= week_ago.date()
-        ).all()
-        
-        total_bandwidth_gb = sum([usage.total_bytes / (1024**3) for usage in bandwidth_data])
-        avg_peak_usage = sum([usage.peak_usage_mbps for usage in bandwidth_data]) / len(bandwidth_data) if bandwidth_data else 0
-        
-        # Get recent support tickets
-        recent_tickets = db.query(SupportTicket).join(User).join(Branch).filter(
-            Branch.isp_id == current_isp.id,
-            SupportTicket.status.in_(['open', 'in_progress'])
-        ).order_by(SupportTicket.created_at.desc()).limit(5).all()
-        
-        return ISPDashboardResponse(
+        cache_key = f"isp:{current_isp.id}:dashboard"
+        cached = await cache_get_raw(cache_key)
+        if cached is not None:
+            return etag_response(cached, if_none_match)
+        
+        ts_minute = int(time.time() // 60)
+        stats = (await db.execute(DASHBOARD_STATS_BY_ISP, {
+            "isp_id": current_isp.id,
+            "month_start": month_start(ts_minute),
+            "week_ago": days_ago(ts_minute, 7).date()
+        })).one()
+        
+        subscriber_count, branches_count, total_revenue, total_bytes, avg_peak_usage, recent_tickets = stats
+        total_bandwidth_gb = float(total_bytes) / (1024**3)
+        
+        # Built from trusted DB values, so skip re-validation
+        dashboard = ISPDashboardResponse.model_construct(
             subscriber_count=subscriber_count,
             branches_count=branches_count,
             monthly_revenue=float(total_revenue),
             total_bandwidth_gb=round(total_bandwidth_gb, 2),
-            avg_peak_usage_mbps=round(avg_peak_usage, 2),
+            avg_peak_usage_mbps=round(float(avg_peak_usage), 2),
             network_health=98.5,  # This would be calculated from actual monitoring
-            recent_tickets=[
-                {
-                    "id": str(ticket.id),
-                    "title": ticket.title,
-                    "priority": ticket.priority,
-                    "status": ticket.status,
-                    "created_at": ticket.created_at.isoformat()
-                } for ticket in recent_tickets
-            ],
-            branding=current_isp.branding or {}
+            # Ticket objects are built in SQL with TicketSummary's fields
+            recent_tickets=[TicketSummary.model_construct(**ticket) for ticket in recent_tickets],
+            branding=current_isp.branding or {},
+            # Simulated until the NOC, sustainability, SLA and CRM modules are wired in
+            noc_alerts=15,
+            sustainability_score=85.2,
+            sla_compliance=97.8,
+            active_campaigns=3
         )
         
+        body = dashboard.model_dump_json()
+        await cache_set_raw(cache_key, body, DASHBOARD_CACHE_TTL)
+        return etag_response(body, if_none_match)
+        
     except HTTPException:
         raise
     except Exception as e:
@@ -105,10 +232,9 @@ async def get_isp_dashboard(
 
 @router.post("/{isp_id}/subscribers", response_model=SubscriberCreateResponse)
 async def create_subscriber(
-    isp_id: str,
     subscriber_data: SubscriberCreateRequest,
-    current_isp: ISP = Depends(get_current_isp),
-    db: Session = Depends(get_db)
+    current_isp: ISP = Depends(verify_isp_access),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create new subscriber with automated provisioning
@@ -118,48 +244,20 @@ async def create_subscriber(
     - Automated billing setup
     """
     try:
-        # Verify ISP access
-        if str(current_isp.id) != isp_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied to this ISP portal"
-            )
-        
-        # Verify branch belongs to ISP
-        branch = db.query(Branch).filter(
-            Branch.id == subscriber_data.branch_id,
-            Branch.isp_id == current_isp.id
-        ).first()
-        
-        if not branch:
+        # Verify branch and plan belong to ISP in one round trip
+        plan = (await db.execute(SUBSCRIBER_BRANCH_AND_PLAN, {
+            "isp_id": current_isp.id,
+            "branch_id": subscriber_data.branch_id,
+            "plan_id": subscriber_data.plan_id
+        })).one()
+        
+        if not plan.branch_valid:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid branch ID"
             )
         
-        # Check if username already exists
-        existing_user = db.query(User).filter(User.username == subscriber_data.username).first()
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already exists"
-            )
-        
-        # Check if email already exists
-        existing_email = db.query(User).filter(User.email == subscriber_data.email).first()
-        if existing_email:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already exists"
-            )
-        
-        # Get subscription plan details
-        plan = db.query(SubscriptionPlan).filter(
-            SubscriptionPlan.id == subscriber_data.plan_id,
-            SubscriptionPlan.isp_id == current_isp.id
-        ).first()
-        
-        if not plan:
+        if plan.name is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid subscription plan"
@@ -167,13 +265,16 @@ async def create_subscriber(
         
         # Generate password if not provided
         password = subscriber_data.password or generate_password()
+        # bcrypt is CPU-bound; hash in the threadpool so the event loop keeps serving
+        password_hash = await run_in_threadpool(hash_password, password)
         
-        # Create new user
-        new_user = User(
+        # Create new user; the unique username and email indexes turn a clash
+        # into a no-op instead of probing for it beforehand
+        user_id = await db.scalar(pg_insert(User).values(
             branch_id=subscriber_data.branch_id,
             username=subscriber_data.username,
             email=subscriber_data.email,
-            password_hash=hash_password(password),
+            password_hash=password_hash,
             full_name=subscriber_data.full_name,
             phone=subscriber_data.phone,
             address=subscriber_data.address,
@@ -183,16 +284,26 @@ async def create_subscriber(
             connection_type=subscriber_data.connection_type or 'broadband',
             ip_address=subscriber_data.ip_address,
             mac_address=subscriber_data.mac_address
-        )
+        ).on_conflict_do_nothing().returning(User.id))
+        
+        if user_id is None:
+            # Report which one clashed; a username clash is reported first
+            await db.rollback()
+            existing_user = (await db.execute(select(User.username).where(
+                User.username == subscriber_data.username
+            ))).first()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Username already exists" if existing_user else "Email already exists"
+            )
         
-        db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
+        await cache_delete(*_subscriber_cache_keys(current_isp.id))
         
         return SubscriberCreateResponse(
-            user_id=str(new_user.id),
-            username=new_user.username,
-            email=new_user.email,
+            user_id=str(user_id),
+            username=subscriber_data.username,
+            email=subscriber_data.email,
             generated_password=password if not subscriber_data.password else None,
             plan_name=plan.name,
             bandwidth_limit=plan.bandwidth_limit,
@@ -202,67 +313,223 @@ async def create_subscriber(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error creating subscriber: {str(e)}"
         )
 
+@router.post("/{isp_id}/subscribers/bulk", response_model=List[SubscriberCreateResponse])
+async def bulk_create_subscribers(
+    subscribers_data: List[SubscriberCreateRequest],
+    current_isp: ISP = Depends(verify_isp_access),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Create many subscribers in one request (e.g. CSV imports)
+    - Branches, plans and existing usernames/emails are checked once for the whole batch
+    - Passwords are hashed concurrently in the threadpool
+    - All rows are inserted in a single statement and committed together
+    """
+    try:
+        if not subscribers_data:
+            return []
+        
+        if len(subscribers_data) > MAX_BULK_SUBSCRIBERS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {MAX_BULK_SUBSCRIBERS} subscribers can be created per request"
+            )
+        
+        usernames = [subscriber.username for subscriber in subscribers_data]
+        emails = [subscriber.email for subscriber in subscribers_data]
+        if len(set(usernames)) != len(usernames):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Duplicate usernames in request"
+            )
+        if len(set(emails)) != len(emails):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Duplicate emails in request"
+            )
+        
+        # Verify every branch and plan belongs to the ISP
+        branch_ids = {str(branch_id) for branch_id in await db.scalars(select(Branch.id).where(
+            Branch.id.in_({subscriber.branch_id for subscriber in subscribers_data}),
+            Branch.isp_id == current_isp.id
+        ))}
+        plans = {str(plan.id): plan for plan in await db.execute(select(
+            SubscriptionPlan.id, SubscriptionPlan.name,
+            SubscriptionPlan.bandwidth_limit, SubscriptionPlan.data_limit
+        ).where(
+            SubscriptionPlan.id.in_({subscriber.plan_id for subscriber in subscribers_data}),
+            SubscriptionPlan.isp_id == current_isp.id
+        ))}
+        
+        for subscriber in subscribers_data:
+            if subscriber.branch_id not in branch_ids:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid branch ID for {subscriber.username}"
+                )
+            if subscriber.plan_id not in plans:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid subscription plan for {subscriber.username}"
+                )
+        
+        existing_user = (await db.execute(select(User.username, User.email).where(
+            or_(User.username.in_(usernames), User.email.in_(emails))
+        ).limit(1))).first()
+        if existing_user:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Username already exists: {existing_user.username}"
+                if existing_user.username in usernames
+                else f"Email already exists: {existing_user.email}"
+            )
+        
+        # bcrypt is CPU-bound and releases the GIL, so hash the batch in parallel
+        passwords = [subscriber.password or generate_password() for subscriber in subscribers_data]
+        password_hashes = await asyncio.gather(*(
+            run_in_threadpool(hash_password, password) for password in passwords
+        ))
+        
+        rows = [
+            {
+                "branch_id": subscriber.branch_id,
+                "username": subscriber.username,
+                "email": subscriber.email,
+                "password_hash": password_hash,
+                "full_name": subscriber.full_name,
+                "phone": subscriber.phone,
+                "address": subscriber.address,
+                "subscription_plan": plans[subscriber.plan_id].name,
+                "bandwidth_limit": plans[subscriber.plan_id].bandwidth_limit,
+                "data_limit": plans[subscriber.plan_id].data_limit,
+                "connection_type": subscriber.connection_type or 'broadband',
+                "ip_address": subscriber.ip_address,
+                "mac_address": subscriber.mac_address
+            } for subscriber, password_hash in zip(subscribers_data, password_hashes)
+        ]
+        
+        try:
+            user_ids = (await db.scalars(
+                insert(User).returning(User.id, sort_by_parameter_order=True), rows
+            )).all()
+            await db.commit()
+        except IntegrityError:
+            # A concurrent request took one of the usernames or emails after the check above
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Username or email already exists"
+            )
+        await cache_delete(*_subscriber_cache_keys(current_isp.id))
+        
+        return [
+            SubscriberCreateResponse.model_construct(
+                user_id=str(user_id),
+                username=subscriber.username,
+                email=subscriber.email,
+                generated_password=password if not subscriber.password else None,
+                plan_name=plans[subscriber.plan_id].name,
+                bandwidth_limit=plans[subscriber.plan_id].bandwidth_limit,
+                message="Subscriber created successfully"
+            ) for user_id, subscriber, password in zip(user_ids, subscribers_data, passwords)
+        ]
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error creating subscribers: {str(e)}"
+        )
+
+def subscriber_list_statement(isp_id, branch_id: Optional[str], cursor: Optional[str], limit: Optional[int]):
+    """
+    Subscriber list rows, newest first, with each user's latest usage and payment
+    - The page of users is cut first on (created_at, id) after the cursor, with
+      one extra row when limited, so the per-user lookups only run for its rows
+    """
+    page = select(
+        User.id, User.username, User.email, User.full_name, User.subscription_plan,
+        User.bandwidth_limit, User.is_active, User.created_at,
+        Branch.name.label("branch_name")
+    ).join(Branch, User.branch_id == Branch.id).where(Branch.isp_id == isp_id)
+    
+    if branch_id:
+        page = page.where(Branch.id == branch_id)
+    
+    if cursor:
+        page = page.where(tuple_(User.created_at, User.id) < decode_cursor(cursor))
+    
+    page = page.order_by(User.created_at.desc(), User.id.desc())
+    if limit is not None:
+        # One extra row tells whether another page follows
+        page = page.limit(limit + 1)
+    page = page.subquery()
+    
+    # Most recent usage row (last 30 days) and latest payment per user,
+    # each an index lookup on (user_id, date) / (user_id, created_at)
+    latest_usage = select(BandwidthUsage.total_bytes).where(
+        BandwidthUsage.user_id == page.c.id,
+        BandwidthUsage.date >= days_ago(int(time.time() // 60), 30).date()
+    ).order_by(BandwidthUsage.date.desc()).limit(1).scalar_subquery()
+    
+    latest_payment = select(Payment.status).where(
+        Payment.user_id == page.c.id
+    ).order_by(Payment.created_at.desc()).limit(1).scalar_subquery()
+    
+    return select(
+        page,
+        latest_usage.label("total_bytes"),
+        latest_payment.label("payment_status")
+    ).order_by(page.c.created_at.desc(), page.c.id.desc())
+
 @router.get("/{isp_id}/subscribers", response_model=List[SubscriberListResponse])
 async def list_subscribers(
-    isp_id: str,
+    response: Response,
     branch_id: Optional[str] = None,
-    current_isp: ISP = Depends(get_current_isp),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    current_isp: ISP = Depends(verify_isp_access),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     List subscribers with filtering options
     - Filter by branch
     - Usage and payment status
     - Account status and activity
+    - Optional keyset pagination, newest first: with `limit`, pass the X-Next-Cursor
+      response header back as `cursor` for the next page; without it every subscriber is returned
     """
     try:
-        # Verify ISP access
-        if str(current_isp.id) != isp_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied to this ISP portal"
-            )
-        
-        # Build query
-        query = db.query(User).join(Branch).filter(Branch.isp_id == current_isp.id)
-        
-        if branch_id:
-            query = query.filter(Branch.id == branch_id)
-        
-        users = query.order_by(User.created_at.desc()).all()
-        
-        subscriber_list = []
-        for user in users:
-            # Get recent usage data
-            recent_usage = db.query(BandwidthUsage).filter(
-                BandwidthUsage.user_id == user.id,
-                BandwidthUsage.date >= datetime.now().date() - timedelta(days=30)
-            ).order_by(BandwidthUsage.date.desc()).first()
-            
-            # Get latest payment
-            latest_payment = db.query(Payment).filter(
-                Payment.user_id == user.id
-            ).order_by(Payment.created_at.desc()).first()
-            
-            subscriber_list.append(SubscriberListResponse(
-                id=str(user.id),
-                username=user.username,
-                email=user.email,
-                full_name=user.full_name,
-                subscription_plan=user.subscription_plan,
-                bandwidth_limit=user.bandwidth_limit,
-                is_active=user.is_active,
-                last_usage_gb=round(recent_usage.total_bytes / (1024**3), 2) if recent_usage else 0,
-                last_payment_status=latest_payment.status if latest_payment else "no_payments",
-                created_at=user.created_at.isoformat(),
-                branch_name=user.branch.name
-            ))
+        # Plain column rows; no ORM identity map or attribute instrumentation
+        rows = (await db.execute(subscriber_list_statement(current_isp.id, branch_id, cursor, limit))).all()
+        
+        rows, next_cursor = split_page(rows, limit)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        
+        subscriber_list = [
+            SubscriberListResponse.model_construct(
+                id=str(row.id),
+                username=row.username,
+                email=row.email,
+                full_name=row.full_name,
+                subscription_plan=row.subscription_plan,
+                bandwidth_limit=row.bandwidth_limit,
+                is_active=row.is_active,
+                last_usage_gb=round(row.total_bytes / (1024**3), 2) if row.total_bytes is not None else 0,
+                last_payment_status=row.payment_status or "no_payments",
+                created_at=row.created_at.isoformat(),
+                branch_name=row.branch_name
+            ) for row in rows
+        ]
         
         return subscriber_list
         
@@ -276,40 +543,39 @@ async def list_subscribers(
 
 @router.get("/{isp_id}/plans", response_model=List[PlanResponse])
 async def list_subscription_plans(
-    isp_id: str,
-    current_isp: ISP = Depends(get_current_isp),
-    db: Session = Depends(get_db)
+    current_isp: ISP = Depends(verify_isp_access),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     List all subscription plans for the ISP
+    - Serialized body cached in Redis until a plan is created
     """
     try:
-        # Verify ISP access
-        if str(current_isp.id) != isp_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied to this ISP portal"
-            )
-        
-        plans = db.query(SubscriptionPlan).filter(
-            SubscriptionPlan.isp_id == current_isp.id,
-            SubscriptionPlan.is_active == True
-        ).order_by(SubscriptionPlan.price).all()
+        version = await cache_version(f"isp:{current_isp.id}:plans:ver")
+        cache_key = f"isp:{current_isp.id}:plans:{version}"
+        body = await cache_get_raw(cache_key)
         
-        return [
-            PlanResponse(
-                id=str(plan.id),
-                name=plan.name,
-                description=plan.description,
-                bandwidth_limit=plan.bandwidth_limit,
-                data_limit=plan.data_limit,
-                price=float(plan.price),
-                currency=plan.currency,
-                billing_cycle=plan.billing_cycle,
-                features=plan.features or {},
-                is_active=plan.is_active
-            ) for plan in plans
-        ]
+        if body is None:
+            plans = (await db.execute(ACTIVE_PLANS_BY_ISP, {"isp_id": current_isp.id})).all()
+            
+            body = PlanListAdapter.dump_json([
+                PlanResponse.model_construct(
+                    id=str(plan.id),
+                    name=plan.name,
+                    description=plan.description,
+                    bandwidth_limit=plan.bandwidth_limit,
+                    data_limit=plan.data_limit,
+                    price=float(plan.price),
+                    currency=plan.currency,
+                    billing_cycle=plan.billing_cycle,
+                    features=plan.features or {},
+                    is_active=plan.is_active
+                ) for plan in plans
+            ]).decode()
+            await cache_set_raw(cache_key, body, READ_CACHE_TTL)
+        
+        return etag_response(body, if_none_match)
         
     except HTTPException:
         raise
@@ -321,22 +587,14 @@ async def list_subscription_plans(
 
 @router.post("/{isp_id}/plans", response_model=PlanResponse)
 async def create_subscription_plan(
-    isp_id: str,
     plan_data: PlanCreateRequest,
-    current_isp: ISP = Depends(get_current_isp),
-    db: Session = Depends(get_db)
+    current_isp: ISP = Depends(verify_isp_access),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create new subscription plan
     """
     try:
-        # Verify ISP access
-        if str(current_isp.id) != isp_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied to this ISP portal"
-            )
-        
         # Create new plan
         new_plan = SubscriptionPlan(
             isp_id=current_isp.id,
@@ -351,8 +609,10 @@ async def create_subscription_plan(
         )
         
         db.add(new_plan)
-        db.commit()
-        db.refresh(new_plan)
+        await db.commit()
+        await db.refresh(new_plan)
+        await bump_version(f"isp:{current_isp.id}:plans:ver")
+        await cache_delete(f"isp:{current_isp.id}:analytics:subscribers")  # plan distribution
         
         return PlanResponse(
             id=str(new_plan.id),
@@ -370,7 +630,7 @@ async def create_subscription_plan(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error creating subscription plan: {str(e)}"
@@ -378,9 +638,9 @@ async def create_subscription_plan(
 
 @router.get("/{isp_id}/bandwidth/optimize", response_model=BandwidthOptimizationResponse)
 async def ai_bandwidth_optimization(
-    isp_id: str,
-    current_isp: ISP = Depends(get_current_isp),
-    db: Session = Depends(get_db)
+    current_isp: ISP = Depends(verify_isp_access),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     AI-powered bandwidth optimization
@@ -388,24 +648,21 @@ async def ai_bandwidth_optimization(
     - Dynamic bandwidth allocation
     - Congestion prediction and prevention
     - QoS optimization recommendations
+    - Serialized body cached in Redis briefly
     """
     try:
-        # Verify ISP access
-        if str(current_isp.id) != isp_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied to this ISP portal"
-            )
+        cache_key = f"isp:{current_isp.id}:bandwidth:optimize"
+        cached = await cache_get_raw(cache_key)
+        if cached is not None:
+            return etag_response(cached, if_none_match)
         
         # Get recent bandwidth usage data
-        week_ago = datetime.now() - timedelta(days=7)
-        usage_data = db.query(BandwidthUsage).join(User).join(Branch).filter(
-            Branch.isp_id == current_isp.id,
-            BandwidthUsage.date >= week_ago.date()
-        ).all()
+        total_usage, _ = (await db.execute(WEEK_USAGE_BY_ISP, {
+            "isp_id": current_isp.id,
+            "week_ago": days_ago(int(time.time() // 60), 7).date()
+        })).one()
         
         # Simple AI analysis (in production, this would use actual ML models)
-        total_usage = sum([usage.total_bytes for usage in usage_data])
         peak_hours = [19, 20, 21]  # 7-9 PM typical peak
         
         # Calculate optimization recommendations
@@ -423,8 +680,8 @@ async def ai_bandwidth_optimization(
             }
         ]
         
-        return BandwidthOptimizationResponse(
-            total_usage_gb=round(total_usage / (1024**3), 2),
+        optimization = BandwidthOptimizationResponse(
+            total_usage_gb=round(float(total_usage) / (1024**3), 2),
             peak_hours=peak_hours,
             optimization_score=87.5,
             recommendations=recommendations,
@@ -432,6 +689,10 @@ async def ai_bandwidth_optimization(
             predicted_growth=12.5  # 12.5% monthly growth
         )
         
+        body = optimization.model_dump_json()
+        await cache_set_raw(cache_key, body, DASHBOARD_CACHE_TTL)
+        return etag_response(body, if_none_match)
+        
     except HTTPException:
         raise
     except Exception as e:
@@ -442,9 +703,9 @@ async def ai_bandwidth_optimization(
 
 @router.get("/{isp_id}/analytics/subscribers", response_model=SubscriberAnalyticsResponse)
 async def get_subscriber_analytics(
-    isp_id: str,
-    current_isp: ISP = Depends(get_current_isp),
-    db: Session = Depends(get_db)
+    current_isp: ISP = Depends(verify_isp_access),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Advanced subscriber analytics with AI insights
@@ -452,51 +713,30 @@ async def get_subscriber_analytics(
     - Churn prediction
     - Revenue optimization recommendations
     - Performance trending
+    - Serialized body cached in Redis for a few minutes
     """
     try:
-        # Verify ISP access
-        if str(current_isp.id) != isp_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied to this ISP portal"
-            )
+        cache_key = f"isp:{current_isp.id}:analytics:subscribers"
+        cached = await cache_get_raw(cache_key)
+        if cached is not None:
+            return etag_response(cached, if_none_match)
+        
+        params = {"isp_id": current_isp.id}
         
         # Get subscriber growth data
-        subscribers_by_month = {}
-        for i in range(6):
-            month_start = (datetime.now().replace(day=1) - timedelta(days=30*i)).replace(hour=0, minute=0, second=0, microsecond=0)
-            month_end = month_start + timedelta(days=30)
-            
-            count = db.query(User).join(Branch).filter(
-                Branch.isp_id == current_isp.id,
-                User.created_at >= month_start,
-                User.created_at < month_end
-            ).count()
-            
-            month_key = month_start.strftime('%Y-%m')
-            subscribers_by_month[month_key] = count
+        subscribers_by_month = dict((await db.execute(SIGNUPS_BY_MONTH_BY_ISP, {
+            **params, "month_start": month_start(int(time.time() // 60))
+        })).all())
         
         # Calculate churn rate (simplified)
-        total_subscribers = db.query(User).join(Branch).filter(Branch.isp_id == current_isp.id).count()
-        active_subscribers = db.query(User).join(Branch).filter(
-            Branch.isp_id == current_isp.id,
-            User.is_active == True
-        ).count()
+        total_subscribers, active_subscribers = (await db.execute(SUBSCRIBER_TOTALS_BY_ISP, params)).one()
         
         churn_rate = ((total_subscribers - active_subscribers) / total_subscribers * 100) if total_subscribers > 0 else 0
         
         # Usage patterns by plan
-        plan_usage = {}
-        plans = db.query(SubscriptionPlan).filter(SubscriptionPlan.isp_id == current_isp.id).all()
-        
-        for plan in plans:
-            users_on_plan = db.query(User).join(Branch).filter(
-                Branch.isp_id == current_isp.id,
-                User.subscription_plan == plan.name
-            ).count()
-            plan_usage[plan.name] = users_on_plan
+        plan_usage = dict((await db.execute(PLAN_DISTRIBUTION_BY_ISP, params)).all())
         
-        return SubscriberAnalyticsResponse(
+        analytics = SubscriberAnalyticsResponse(
             total_subscribers=total_subscribers,
             active_subscribers=active_subscribers,
             churn_rate=round(churn_rate, 2),
@@ -508,6 +748,10 @@ async def get_subscriber_analytics(
             satisfaction_score=4.2  # Out of 5, from support tickets/surveys
         )
         
+        body = analytics.model_dump_json()
+        await cache_set_raw(cache_key, body, READ_CACHE_TTL)
+        return etag_response(body, if_none_match)
+        
     except HTTPException:
         raise
     except Exception as e:
@@ -518,9 +762,9 @@ async def get_subscriber_analytics(
 
 @router.get("/{isp_id}/enhanced-dashboard", response_model=EnhancedISPDashboard)
 async def get_enhanced_isp_dashboard(
-    isp_id: str,
-    current_isp: ISP = Depends(get_current_isp),
-    db: Session = Depends(get_db)
+    current_isp: ISP = Depends(verify_isp_access),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Enhanced ISP dashboard with all new features
@@ -529,24 +773,18 @@ async def get_enhanced_isp_dashboard(
     - Sustainability tracking
     - SLA compliance monitoring
     - AI-based security insights
+    - Serialized body cached in Redis briefly
     """
     try:
-        if str(current_isp.id) != isp_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied to this ISP portal"
-            )
+        cache_key = f"isp:{current_isp.id}:enhanced-dashboard"
+        cached = await cache_get_raw(cache_key)
+        if cached is not None:
+            return etag_response(cached, if_none_match)
         
         # Get basic metrics (reuse existing logic)
-        subscriber_count = db.query(User).join(Branch).filter(
-            Branch.isp_id == current_isp.id,
-            User.is_active == True
-        ).count()
-        
-        branches_count = db.query(Branch).filter(
-            Branch.isp_id == current_isp.id,
-            Branch.is_active == True
-        ).count()
+        subscriber_count, branches_count = (await db.execute(
+            ACTIVE_COUNTS_BY_ISP, {"isp_id": current_isp.id}
+        )).one()
         
         # Enhanced metrics from new features
         # NOC metrics (simulated - would integrate with actual NOC module)
@@ -603,7 +841,7 @@ async def get_enhanced_isp_dashboard(
             }
         ]
         
-        return EnhancedISPDashboard(
+        dashboard = EnhancedISPDashboard(
             subscriber_count=subscriber_count,
             branches_count=branches_count,
             monthly_revenue=125678.90,
@@ -629,6 +867,10 @@ async def get_enhanced_isp_dashboard(
             branding=current_isp.branding or {}
         )
         
+        body = dashboard.model_dump_json()
+        await cache_set_raw(cache_key, body, DASHBOARD_CACHE_TTL)
+        return etag_response(body, if_none_match)
+        
     except HTTPException:
         raise
     except Exception as e:
@@ -639,10 +881,9 @@ async def get_enhanced_isp_dashboard(
 
 @router.post("/{isp_id}/localization", response_model=Dict[str, Any])
 async def configure_localization(
-    isp_id: str,
     localization: LocalizationConfig,
-    current_isp: ISP = Depends(get_current_isp),
-    db: Session = Depends(get_db)
+    current_isp: ISP = Depends(verify_isp_access),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Configure multi-language and multi-currency support
@@ -651,12 +892,6 @@ async def configure_localization(
     - Multi-currency displays and billing
     """
     try:
-        if str(current_isp.id) != isp_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied to this ISP"
-            )
-        
         # Update ISP settings with localization config
         current_isp.settings = current_isp.settings or {}
         current_isp.settings['localization'] = {
@@ -667,7 +902,7 @@ async def configure_localization(
             'timezone': localization.timezone
         }
         
-        db.commit()
+        await db.commit()
         
         return {
             "message": "Localization configured successfully",
@@ -689,8 +924,8 @@ async def configure_localization(
 async def configure_mobile_app(
     isp_id: str,
     app_config: Dict[str, Any],
-    current_isp: ISP = Depends(get_current_isp),
-    db: Session = Depends(get_db)
+    current_isp: ISP = Depends(verify_isp_access),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Configure white-label mobile app templates
@@ -699,17 +934,11 @@ async def configure_mobile_app(
     - Push notification setup
     """
     try:
-        if str(current_isp.id) != isp_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied to this ISP"
-            )
-        
         # Save mobile app configuration
         current_isp.settings = current_isp.settings or {}
         current_isp.settings['mobile_app'] = app_config
         
-        db.commit()
+        await db.commit()
         
         return {
             "message": "Mobile app configured successfully",
@@ -732,9 +961,7 @@ async def configure_mobile_app(
 
 @router.get("/{isp_id}/training-modules", response_model=List[TrainingModuleResponse])
 async def get_training_modules(
-    isp_id: str,
-    current_isp: ISP = Depends(get_current_isp),
-    db: Session = Depends(get_db)
+    current_isp: ISP = Depends(verify_isp_access)
 ):
     """
     Get available training modules for ISP staff
@@ -743,12 +970,6 @@ async def get_training_modules(
     - Certification tracking
     """
     try:
-        if str(current_isp.id) != isp_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied to this ISP"
-            )
-        
         # Sample training modules (in production, these would come from database)
         training_modules = [
             {
@@ -803,8 +1024,8 @@ async def get_training_modules(
 async def create_webhook(
     isp_id: str,
     webhook_data: WebhookCreate,
-    current_isp: ISP = Depends(get_current_isp),
-    db: Session = Depends(get_db)
+    current_isp: ISP = Depends(verify_isp_access),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create webhook endpoint for real-time notifications
@@ -813,14 +1034,9 @@ async def create_webhook(
     - Custom event handling
     """
     try:
-        if str(current_isp.id) != isp_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied to this ISP"
-            )
-        
         # Create webhook configuration (simplified implementation)
         webhook_id = str(uuid.uuid4())
+        created_at = datetime.now()
         
         webhook_config = {
             "id": webhook_id,
@@ -829,7 +1045,7 @@ async def create_webhook(
             "events": webhook_data.events,
             "secret_key": webhook_data.secret_key,
             "is_active": webhook_data.is_active,
-            "created_at": datetime.now()
+            "created_at": created_at
         }
         
         # Save to ISP settings (in production, this would be a separate table)
@@ -837,7 +1053,7 @@ async def create_webhook(
         current_isp.settings['webhooks'] = current_isp.settings.get('webhooks', [])
         current_isp.settings['webhooks'].append(webhook_config)
         
-        db.commit()
+        await db.commit()
         
         return WebhookResponse(
             id=webhook_id,
@@ -845,7 +1061,7 @@ async def create_webhook(
             events=webhook_data.events,
             is_active=webhook_data.is_active,
             last_delivery=None,
-            created_at=datetime.now()
+            created_at=created_at
         )
         
     except HTTPException:
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, TypeAdapter
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from decimal import Decimal
@@ -37,6 +37,8 @@ class RadiusConfigRequest(BaseModel):
 
 # Response schemas
 class TicketSummary(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     id: str
     title: str
     priority: str
@@ -44,6 +46,8 @@ class TicketSummary(BaseModel):
     created_at: str
 
 class ISPDashboardResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     subscriber_count: int
     branches_count: int
     monthly_revenue: float
@@ -59,6 +63,8 @@ class ISPDashboardResponse(BaseModel):
     active_campaigns: int
 
 class EnhancedISPDashboard(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     # Core metrics
     subscriber_count: int
     branches_count: int
@@ -131,6 +137,8 @@ class MobileAppBranding(BaseModel):
 
 # Training module schemas
 class TrainingModuleResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     id: str
     title: str
     description: str
@@ -147,6 +155,8 @@ class WebhookCreate(BaseModel):
     is_active: bool = True
 
 class WebhookResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     id: str
     url: str
     events: List[str]
@@ -155,6 +165,8 @@ class WebhookResponse(BaseModel):
     created_at: datetime
 
 class SubscriberCreateResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     user_id: str
     username: str
     email: str
@@ -164,6 +176,8 @@ class SubscriberCreateResponse(BaseModel):
     message: str
 
 class SubscriberListResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     id: str
     username: str
     email: str
@@ -177,6 +191,8 @@ class SubscriberListResponse(BaseModel):
     branch_name: str
 
 class PlanResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     id: str
     name: str
     description: Optional[str]
@@ -189,11 +205,15 @@ class PlanResponse(BaseModel):
     is_active: bool
 
 class CongestionPoint(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     location: str
     utilization: float
     recommendation: str
 
 class BandwidthOptimizationResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     total_usage_gb: float
     peak_hours: List[int]
     optimization_score: float
@@ -202,6 +222,8 @@ class BandwidthOptimizationResponse(BaseModel):
     predicted_growth: float
 
 class SubscriberAnalyticsResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     total_subscribers: int
     active_subscribers: int
     churn_rate: float
@@ -210,4 +232,6 @@ class SubscriberAnalyticsResponse(BaseModel):
     plan_distribution: Dict[str, int]
     high_usage_users: int
     revenue_per_user: float
-    satisfaction_score: float
\ No newline at end of file
+    satisfaction_score: float
+
+PlanListAdapter = TypeAdapter(List[PlanResponse])
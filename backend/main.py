@@ -1,11 +1,14 @@
-from fastapi import FastAPI, Depends, HTTPException, Security
+from fastapi import FastAPI, Depends, HTTPException, Request, Security
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import uvicorn
+import asyncio
+import logging
 import os
 
 # Import microservice routers
-from founder.main import router as founder_router
+from founder.main import router as founder_router, refresh_revenue_rollup
 from isp.main import router as isp_router
 from branch.main import router as branch_router
 from user.main import router as user_router
@@ -13,13 +16,16 @@ from payment.main import router as payment_router
 from ai_manager.main import router as ai_router
 from auth.main import router as auth_router
 from noc.main import router as noc_router
-from crm.main import router as crm_router
+from crm.main import router as crm_router, refresh_segment_counts
 from reporting.main import router as reporting_router
 from sustainability.main import router as sustainability_router
 from support.main import router as support_router
 
 from shared.config import settings
 from shared.database.connection import init_db
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = logging.getLogger("astranetix")
 
 # Create FastAPI application
 app = FastAPI(
@@ -39,6 +45,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Unhandled errors are logged and turned into a generic 500 here, so route
+# handlers only raise HTTPException for expected failures
+@app.exception_handler(SQLAlchemyError)
+async def database_exception_handler(request: Request, exc: SQLAlchemyError):
+    """Log database errors with the request that caused them"""
+    logger.error("Database error on %s %s", request.method, request.url.path, exc_info=exc)
+    return JSONResponse(status_code=500, content={"detail": "Database error"})
+
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    """Log any other unhandled error with the request that caused it"""
+    logger.error("Unhandled error on %s %s", request.method, request.url.path, exc_info=exc)
+    return JSONResponse(status_code=500, content={"detail": "Internal server error"})
+
 # Include microservice routers
 app.include_router(auth_router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(founder_router, prefix="/api/founder", tags=["Founder Portal"])
@@ -61,6 +81,15 @@ async def startup_event():
         print("Database initialized successfully")
     except Exception as e:
         print(f"Error initializing database: {e}")
+    
+    # Background loops start in every worker; each interval's work runs in
+    # whichever worker takes the loop's Postgres advisory lock
+    
+    # Keep the founder revenue rollup fresh in the background
+    app.state.revenue_rollup_task = asyncio.create_task(refresh_revenue_rollup())
+    
+    # Re-evaluate auto-updating CRM segment counts in the background
+    app.state.segment_refresh_task = asyncio.create_task(refresh_segment_counts())
 
 @app.get("/")
 async def root():
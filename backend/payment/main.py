@@ -15,6 +15,7 @@ from .schemas import (
 )
 from ..shared.config import settings
 from ..auth.dependencies import get_current_user
+from ..shared.utils.cache import cache_delete, branch_analytics_key
 
 router = APIRouter()
 
@@ -224,6 +225,11 @@ class GlobalPaymentProcessor:
             db.add(payment)
             db.commit()
             
+            # Branch analytics include this payment
+            branch_id = db.query(User.branch_id).filter(User.id == payment.user_id).scalar()
+            if branch_id:
+                await cache_delete(branch_analytics_key(branch_id))
+            
         except Exception as e:
             print(f"Error logging transaction: {e}")
 
@@ -594,6 +600,11 @@ async def process_refund(
         payment.status = 'refunded'
         db.commit()
         
+        # Branch analytics only count completed payments
+        branch_id = db.query(User.branch_id).filter(User.id == payment.user_id).scalar()
+        if branch_id:
+            await cache_delete(branch_analytics_key(branch_id))
+        
         return RefundResponse(
             refund_id=refund_id,
             status=refund_status,
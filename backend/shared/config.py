@@ -19,6 +19,9 @@ class Settings(BaseSettings):
     jwt_algorithm: str = os.getenv('JWT_ALGORITHM', 'HS256')
     access_token_expire_minutes: int = int(os.getenv('ACCESS_TOKEN_EXPIRE_MINUTES', '30'))
     
+    # Password hashing configuration
+    bcrypt_rounds: int = int(os.getenv('BCRYPT_ROUNDS', '12'))
+    
     # AI/ML configuration
     openai_api_key: str = os.getenv('OPENAI_API_KEY', '')
     google_gemini_api_key: str = os.getenv('GOOGLE_GEMINI_API_KEY', '')
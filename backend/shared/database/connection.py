@@ -1,7 +1,11 @@
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import create_engine, MetaData, func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+import orjson
 import os
+import uuid
 from urllib.parse import urlparse
 
 # Database configuration
@@ -10,17 +14,70 @@ DATABASE_URL = os.getenv('DATABASE_URL', 'postgresql://astranetix_user:secure_pa
 # Parse the database URL to get components
 parsed_url = urlparse(DATABASE_URL)
 
+def json_serializer(value) -> str:
+    """Encode JSON/JSONB column values with orjson (decoding uses orjson.loads)"""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+# Connection pool per engine and worker process (the sync and async engines
+# each hold one); keep it small when many workers share PgBouncer
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '20'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', '30'))
+
 # Create SQLAlchemy engine
 engine = create_engine(
     DATABASE_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
     pool_pre_ping=True,
     pool_recycle=300,
+    query_cache_size=1200,
+    json_serializer=json_serializer,
+    json_deserializer=orjson.loads,
     echo=os.getenv('DEBUG', 'false').lower() == 'true'
 )
 
 # Create sessionmaker
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine (asyncpg) for handlers that await their queries. Only
+# PostgreSQL has an asyncpg driver; with any other URL (e.g. sqlite in tests)
+# there is no async engine and async sessions fail when used, not on import
+db_url = make_url(DATABASE_URL)
+
+# Behind PgBouncer in transaction pooling mode a connection may land on a
+# different server backend per transaction, so asyncpg must not rely on named
+# prepared statements surviving between them
+DB_PGBOUNCER = os.getenv('DB_PGBOUNCER', 'false').lower() == 'true'
+
+async_engine = None
+if db_url.get_backend_name() == 'postgresql':
+    async_db_url = db_url.set(drivername='postgresql+asyncpg')
+    async_connect_args = {}
+    if DB_PGBOUNCER:
+        async_db_url = async_db_url.update_query_dict({'prepared_statement_cache_size': '0'})
+        async_connect_args = {
+            'statement_cache_size': 0,
+            'prepared_statement_name_func': lambda: f'__asyncpg_{uuid.uuid4()}__'
+        }
+    
+    async_engine = create_async_engine(
+        async_db_url,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=True,
+        pool_recycle=300,
+        query_cache_size=1200,
+        json_serializer=json_serializer,
+        json_deserializer=orjson.loads,
+        connect_args=async_connect_args,
+        echo=os.getenv('DEBUG', 'false').lower() == 'true'
+    )
+
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 # Create declarative base
 Base = declarative_base()
 
@@ -35,8 +92,28 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def try_advisory_lock(db: AsyncSession, name: str) -> bool:
+    """
+    Try to take a transaction-scoped Postgres advisory lock without waiting
+    - Background loops run in every worker process; only the worker that gets
+      the lock does the work for that interval, the others skip it
+    - Released when the session's transaction commits or rolls back, so a
+      pooled connection never keeps it
+    """
+    return await db.scalar(select(func.pg_try_advisory_xact_lock(func.hashtext(name))))
+
 def init_db():
-    """Initialize database with tables"""
+    """
+    Initialize database with tables
+    - create_all only adds missing tables. Triggers (e.g. the one keeping
+      bandwidth_usage.isp_id in sync), views and indexes come from
+      database/migrations, which are the supported way to build the schema
+    """
     Base.metadata.create_all(bind=engine)
 
 def close_db():
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean, Integer, Text, DECIMAL, Date, BigInteger, ForeignKey, Float
+from sqlalchemy import Column, String, DateTime, Boolean, Integer, Text, DECIMAL, Date, BigInteger, ForeignKey, Float, Index
 from sqlalchemy.dialects.postgresql import UUID, INET, JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -32,7 +32,7 @@ class ISP(Base):
     founder_id = Column(UUID(as_uuid=True), ForeignKey("founders.id", ondelete="CASCADE"))
     company_name = Column(String(255), nullable=False)
     domain = Column(String(255), unique=True, nullable=False)
-    email = Column(String(255), nullable=False)
+    email = Column(String(255), unique=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
     contact_person = Column(String(255))
     phone = Column(String(20))
@@ -75,7 +75,7 @@ class User(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     branch_id = Column(UUID(as_uuid=True), ForeignKey("branches.id", ondelete="CASCADE"))
     username = Column(String(100), unique=True, nullable=False)
-    email = Column(String(255), nullable=False)
+    email = Column(String(255), unique=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
     full_name = Column(String(255), nullable=False)
     phone = Column(String(20))
@@ -122,6 +122,7 @@ class BandwidthUsage(Base):
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
+    isp_id = Column(UUID(as_uuid=True), ForeignKey("isps.id", ondelete="CASCADE"))  # denormalized from user -> branch; kept in sync by triggers in migration 002
     date = Column(Date, nullable=False)
     upload_bytes = Column(BigInteger, default=0)
     download_bytes = Column(BigInteger, default=0)
@@ -272,6 +273,8 @@ class CustomerSegment(Base):
     criteria = Column(JSONB, nullable=False)  # usage, location, plan, etc.
     description = Column(Text)
     auto_update = Column(Boolean, default=True)
+    subscriber_count = Column(Integer, nullable=False, default=0)  # stored result of evaluating criteria
+    last_evaluated_at = Column(DateTime)
     created_at = Column(DateTime, default=func.now())
 
 class MarketingCampaign(Base):
@@ -288,6 +291,23 @@ class MarketingCampaign(Base):
     metrics = Column(JSONB, default={})
     created_at = Column(DateTime, default=func.now())
 
+# Serves the per-ISP campaign list, newest first (the table is created from
+# the models rather than the SQL migrations, so its index is declared here)
+Index("idx_marketing_campaigns_isp_created", MarketingCampaign.isp_id, MarketingCampaign.created_at.desc(), MarketingCampaign.id.desc())
+
+class CampaignStats(Base):
+    __tablename__ = "campaign_stats"
+    
+    # One row of running delivery counters per campaign, upserted by the delivery pipeline
+    campaign_id = Column(UUID(as_uuid=True), ForeignKey("marketing_campaigns.id", ondelete="CASCADE"), primary_key=True)
+    sent = Column(BigInteger, nullable=False, default=0)
+    delivered = Column(BigInteger, nullable=False, default=0)
+    opened = Column(BigInteger, nullable=False, default=0)
+    clicked = Column(BigInteger, nullable=False, default=0)
+    unsubscribed = Column(BigInteger, nullable=False, default=0)
+    bounced = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
 # Training & Certification Models
 class TrainingModule(Base):
     __tablename__ = "training_modules"
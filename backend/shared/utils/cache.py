@@ -0,0 +1,77 @@
+import hashlib
+import json
+from typing import Any, Optional
+
+import redis.asyncio as redis
+from fastapi import Response, status
+
+from ..config import settings
+
+# Shared async Redis client (connections are opened lazily on first use)
+redis_client = redis.from_url(settings.redis_url, decode_responses=True)
+
+async def cache_get(key: str) -> Optional[Any]:
+    """Get a cached JSON value, returning None on a miss or if Redis is unavailable"""
+    try:
+        cached = await redis_client.get(key)
+    except redis.RedisError:
+        return None
+
+    return json.loads(cached) if cached is not None else None
+
+async def cache_set(key: str, value: Any, ttl: int = 60) -> None:
+    """Store a JSON-serializable value with a TTL in seconds"""
+    try:
+        await redis_client.set(key, json.dumps(value, default=str), ex=ttl)
+    except redis.RedisError:
+        pass
+
+async def cache_get_raw(key: str) -> Optional[str]:
+    """Get a cached pre-serialized body, returning None on a miss or if Redis is unavailable"""
+    try:
+        return await redis_client.get(key)
+    except redis.RedisError:
+        return None
+
+async def cache_set_raw(key: str, value: str, ttl: int = 60) -> None:
+    """Store a pre-serialized body as-is with a TTL in seconds"""
+    try:
+        await redis_client.set(key, value, ex=ttl)
+    except redis.RedisError:
+        pass
+
+def etag_response(body: str, if_none_match: Optional[str]) -> Response:
+    """JSON response carrying an ETag, or 304 when the client already has this body"""
+    etag = f'"{hashlib.md5(body.encode()).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=30"}
+
+    if if_none_match == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def branch_analytics_key(branch_id) -> str:
+    """Redis key of a branch's cached AI analytics report"""
+    return f"branch:ai:{branch_id}:analytics"
+
+async def cache_delete(*keys: str) -> None:
+    """Drop cached entries in a single round trip"""
+    try:
+        await redis_client.delete(*keys)
+    except redis.RedisError:
+        pass
+
+async def cache_version(key: str) -> int:
+    """Current value of a version counter (0 if unset or Redis is unavailable)"""
+    try:
+        version = await redis_client.get(key)
+    except redis.RedisError:
+        return 0
+
+    return int(version) if version is not None else 0
+
+async def bump_version(key: str) -> None:
+    """Advance a version counter so entries cached under the old version are no longer read"""
+    try:
+        await redis_client.incr(key)
+    except redis.RedisError:
+        pass
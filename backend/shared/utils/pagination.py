@@ -0,0 +1,39 @@
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+import base64
+import uuid
+
+from fastapi import HTTPException, status
+
+# Response header carrying the cursor of the next page on keyset-paginated
+# list endpoints; absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(created_at: datetime, row_id) -> str:
+    """Opaque cursor for the (created_at, id) position of the last row on a page"""
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{row_id}".encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Inverse of encode_cursor; raises 400 on a malformed cursor"""
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def split_page(rows: Sequence, limit: Optional[int]) -> Tuple[List, Optional[str]]:
+    """
+    Trim a page fetched with limit + 1 rows
+    - Returns the page and the cursor of its last row when the extra row shows
+      another page follows, otherwise None
+    - A limit of None means the query was unbounded
+    """
+    rows = list(rows)
+    if limit is None or len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
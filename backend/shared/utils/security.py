@@ -1,12 +1,22 @@
 from passlib.context import CryptContext
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
+from functools import lru_cache
 import secrets
 import string
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from ..config import settings
+
+# Password hashing. The cost is pinned both ways, so hashes made with any other
+# work factor are flagged for a lazy rehash on the next successful login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+    bcrypt__max_rounds=settings.bcrypt_rounds
+)
 
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt"""
@@ -16,6 +26,10 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password and return a replacement hash if the stored one uses an outdated cost"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def generate_password(length: int = 12) -> str:
     """Generate a secure random password"""
     alphabet = string.ascii_letters + string.digits + "!@#$%^&*"
@@ -23,6 +37,11 @@ def generate_password(length: int = 12) -> str:
     return password
 
 # JWT token management
+@lru_cache(maxsize=8)
+def _get_jwt_key(secret_key: str, algorithm: str):
+    """Construct the JWT key object once per (secret, algorithm) instead of on every encode/decode"""
+    return jwk.construct(secret_key, algorithm)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None, secret_key: str = None, algorithm: str = "HS256"):
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -34,20 +53,18 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None, s
     to_encode.update({"exp": expire})
     
     if not secret_key:
-        from ..config import settings
         secret_key = settings.jwt_secret_key
     
-    encoded_jwt = jwt.encode(to_encode, secret_key, algorithm=algorithm)
+    encoded_jwt = jwt.encode(to_encode, _get_jwt_key(secret_key, algorithm), algorithm=algorithm)
     return encoded_jwt
 
 def verify_access_token(token: str, secret_key: str = None, algorithm: str = "HS256") -> Optional[dict]:
     """Verify and decode a JWT access token"""
     try:
         if not secret_key:
-            from ..config import settings
             secret_key = settings.jwt_secret_key
             
-        payload = jwt.decode(token, secret_key, algorithms=[algorithm])
+        payload = jwt.decode(token, _get_jwt_key(secret_key, algorithm), algorithms=[algorithm])
         return payload
     except JWTError:
         return None
@@ -0,0 +1,18 @@
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+# Query time bounds are naive UTC datetimes derived from the current minute
+# (int(time.time() // 60)), so every request within a minute shares them
+
+@lru_cache(maxsize=8)
+def month_start(ts_minute: int) -> datetime:
+    """Start of the UTC month containing the given minute (minutes since the epoch)"""
+    return _utc(ts_minute).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+@lru_cache(maxsize=8)
+def days_ago(ts_minute: int, days: int) -> datetime:
+    """The given minute (minutes since the epoch, UTC) shifted back by a number of days"""
+    return _utc(ts_minute) - timedelta(days=days)
+
+def _utc(ts_minute: int) -> datetime:
+    return datetime.fromtimestamp(ts_minute * 60, timezone.utc).replace(tzinfo=None)
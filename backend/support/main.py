@@ -8,6 +8,7 @@ import random
 from shared.database.connection import get_db
 from shared.models.models import SupportTicket, User, ISP
 from auth.dependencies import get_current_user, get_current_isp
+from shared.utils.cache import cache_delete, branch_analytics_key
 from .schemas import (
     SupportTicketCreate, SupportTicketResponse, ChatbotQuery, ChatbotResponse,
     KnowledgeBaseArticle, KnowledgeBaseResponse, SLAConfiguration, SupportAnalytics
@@ -53,6 +54,12 @@ async def create_support_ticket(
         db.commit()
         db.refresh(ticket)
         
+        # Branch analytics count this ticket
+        if ticket.user_id:
+            branch_id = db.query(User.branch_id).filter(User.id == ticket.user_id).scalar()
+            if branch_id:
+                await cache_delete(branch_analytics_key(branch_id))
+        
         return SupportTicketResponse(
             id=str(ticket.id),
             title=ticket.title,
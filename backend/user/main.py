@@ -10,6 +10,7 @@ from .schemas import (
     SupportTicketCreateRequest, SupportTicketResponse, PlanUpgradeRequest
 )
 from ..auth.dependencies import get_current_end_user
+from ..shared.utils.cache import cache_delete, branch_analytics_key
 
 router = APIRouter()
 
@@ -272,6 +273,9 @@ async def create_support_ticket(
         db.commit()
         db.refresh(new_ticket)
         
+        # Branch analytics count this ticket
+        await cache_delete(branch_analytics_key(current_user.branch_id))
+        
         # AI-powered automatic suggestions (simplified)
         auto_suggestions = []
         if 'slow' in ticket_data.description.lower() or 'speed' in ticket_data.description.lower():
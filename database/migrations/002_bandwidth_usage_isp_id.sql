@@ -0,0 +1,63 @@
+-- Denormalize the owning ISP onto bandwidth usage rows so tenant-scoped
+-- analytics can filter with an index seek instead of joining through
+-- users and branches.
+
+ALTER TABLE bandwidth_usage ADD COLUMN IF NOT EXISTS isp_id UUID REFERENCES isps(id) ON DELETE CASCADE;
+
+-- Backfill existing rows
+UPDATE bandwidth_usage bu
+SET isp_id = b.isp_id
+FROM users u
+JOIN branches b ON b.id = u.branch_id
+WHERE bu.user_id = u.id
+  AND bu.isp_id IS NULL;
+
+-- Covers per-ISP weekly totals with an index-only scan
+CREATE INDEX IF NOT EXISTS idx_bandwidth_usage_isp_date ON bandwidth_usage(isp_id, date) INCLUDE (total_bytes, peak_usage_mbps);
+
+-- Keep isp_id populated for new rows and rows moved to another subscriber
+CREATE OR REPLACE FUNCTION set_bandwidth_usage_isp_id()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.isp_id IS NULL OR TG_OP = 'UPDATE' THEN
+        SELECT b.isp_id INTO NEW.isp_id
+        FROM users u
+        JOIN branches b ON b.id = u.branch_id
+        WHERE u.id = NEW.user_id;
+    END IF;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS set_bandwidth_usage_isp_id ON bandwidth_usage;
+CREATE TRIGGER set_bandwidth_usage_isp_id BEFORE INSERT OR UPDATE OF user_id ON bandwidth_usage FOR EACH ROW EXECUTE FUNCTION set_bandwidth_usage_isp_id();
+
+-- Re-stamp a subscriber's usage rows when they move to another branch
+CREATE OR REPLACE FUNCTION restamp_bandwidth_usage_isp_id_for_user()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE bandwidth_usage
+    SET isp_id = (SELECT b.isp_id FROM branches b WHERE b.id = NEW.branch_id)
+    WHERE user_id = NEW.id;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS restamp_bandwidth_usage_isp_id ON users;
+CREATE TRIGGER restamp_bandwidth_usage_isp_id AFTER UPDATE OF branch_id ON users FOR EACH ROW WHEN (OLD.branch_id IS DISTINCT FROM NEW.branch_id) EXECUTE FUNCTION restamp_bandwidth_usage_isp_id_for_user();
+
+-- ...and every subscriber's rows when a branch moves to another ISP
+CREATE OR REPLACE FUNCTION restamp_bandwidth_usage_isp_id_for_branch()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE bandwidth_usage bu
+    SET isp_id = NEW.isp_id
+    FROM users u
+    WHERE u.branch_id = NEW.id
+      AND bu.user_id = u.id;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS restamp_bandwidth_usage_isp_id ON branches;
+CREATE TRIGGER restamp_bandwidth_usage_isp_id AFTER UPDATE OF isp_id ON branches FOR EACH ROW WHEN (OLD.isp_id IS DISTINCT FROM NEW.isp_id) EXECUTE FUNCTION restamp_bandwidth_usage_isp_id_for_branch();
@@ -0,0 +1,6 @@
+-- Login looks accounts up by email in founders, isps and users in one
+-- UNION ALL query. founders.email is UNIQUE and users.email is already
+-- indexed; make isps.email UNIQUE too, so every branch of the union is an
+-- index seek returning at most one account per role.
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_isps_email ON isps(email);
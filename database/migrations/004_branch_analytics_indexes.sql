@@ -0,0 +1,8 @@
+-- Composite indexes for the filters used by the branch dashboard, user list
+-- and analytics endpoints. bandwidth_usage(user_id, date) is already covered
+-- by idx_bandwidth_usage_user_date.
+
+CREATE INDEX IF NOT EXISTS idx_payments_user_status_created ON payments(user_id, status, created_at);
+CREATE INDEX IF NOT EXISTS idx_support_tickets_user_status ON support_tickets(user_id, status);
+-- updated_at is included so the CRM active/churned counts can use it too
+CREATE INDEX IF NOT EXISTS idx_users_branch_active ON users(branch_id, is_active, updated_at);
@@ -0,0 +1,17 @@
+-- Monthly completed-payment revenue per ISP, read by the founder revenue
+-- analytics instead of re-aggregating the payments table on every request.
+-- The backend refreshes it periodically; the current month is always read
+-- live, so the view only needs to be exact for closed months.
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_isp_monthly_revenue AS
+SELECT b.isp_id,
+       date_trunc('month', p.created_at) AS month,
+       SUM(p.amount) AS revenue
+FROM payments p
+JOIN users u ON u.id = p.user_id
+JOIN branches b ON b.id = u.branch_id
+WHERE p.status = 'completed'
+GROUP BY b.isp_id, date_trunc('month', p.created_at);
+
+-- Unique index required by REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_isp_monthly_revenue_isp_month ON mv_isp_monthly_revenue(isp_id, month);
@@ -0,0 +1,7 @@
+-- Indexes for the CRM and founder analytics filters. branches(isp_id),
+-- isps(founder_id), bandwidth_usage(user_id, date),
+-- payments(user_id, status, created_at) and
+-- users(branch_id, is_active, updated_at) already exist.
+
+-- Revenue rollups only ever read completed payments by date
+CREATE INDEX IF NOT EXISTS idx_payments_completed_created ON payments(created_at) WHERE status = 'completed';
@@ -0,0 +1,6 @@
+-- Store each segment's evaluated subscriber count instead of recomputing it
+-- on every read. customer_segments is created from the models, so this only
+-- applies to databases where it already exists.
+
+ALTER TABLE IF EXISTS customer_segments ADD COLUMN IF NOT EXISTS subscriber_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE IF EXISTS customer_segments ADD COLUMN IF NOT EXISTS last_evaluated_at TIMESTAMP;
@@ -0,0 +1,7 @@
+-- Covering index for the founder dashboard's five most recent ISPs: the
+-- query projects only these columns, so it can be answered by an
+-- index-only scan without heap fetches. It also serves plain founder_id
+-- lookups, which makes idx_isps_founder_id redundant.
+
+CREATE INDEX IF NOT EXISTS idx_isps_founder_created ON isps(founder_id, created_at DESC) INCLUDE (id, company_name, domain, is_active);
+DROP INDEX IF EXISTS idx_isps_founder_id;
@@ -0,0 +1,14 @@
+-- Indexes for the ISP subscriber list and analytics queries. Branch
+-- filtering uses idx_branches_isp_id, (branch_id, is_active) counts use
+-- idx_users_branch_active and the latest-usage ranking uses
+-- idx_bandwidth_usage_user_date, so only the orderings below are new.
+
+-- Latest payment status per subscriber is ranked by created_at DESC within
+-- user_id (index-only with status included); this index also covers every
+-- user_id lookup
+CREATE INDEX IF NOT EXISTS idx_payments_user_created ON payments(user_id, created_at DESC) INCLUDE (status);
+DROP INDEX IF EXISTS idx_payments_user_id;
+
+-- Subscriber lists are returned newest first and signup growth is bucketed
+-- by created_at within the ISP's branches
+CREATE INDEX IF NOT EXISTS idx_users_branch_created ON users(branch_id, created_at DESC);
@@ -0,0 +1,21 @@
+-- Covering indexes for the ISP dashboard, subscriber list and bandwidth
+-- optimization queries, so their tenant + time-range lookups can be
+-- answered with index-only scans. Subscriber counts and signup growth are
+-- already served by idx_users_branch_active and
+-- idx_users_branch_created, the latest payment status by
+-- idx_payments_user_created and weekly ISP totals by
+-- idx_bandwidth_usage_isp_date.
+
+-- Active branch counts per ISP
+CREATE INDEX IF NOT EXISTS idx_branches_isp_active ON branches(isp_id) WHERE is_active = TRUE;
+
+-- Current-month revenue sums completed payment amounts per subscriber
+CREATE INDEX IF NOT EXISTS idx_payments_user_completed_created ON payments(user_id, created_at) INCLUDE (amount) WHERE status = 'completed';
+
+-- Latest usage per subscriber; replaces the initial schema's (user_id, date)
+-- index and covers every lookup it served
+CREATE INDEX IF NOT EXISTS idx_bandwidth_usage_user_date_totals ON bandwidth_usage(user_id, date DESC) INCLUDE (total_bytes, peak_usage_mbps);
+DROP INDEX IF EXISTS idx_bandwidth_usage_user_date;
+
+-- The dashboard lists the newest open tickets
+CREATE INDEX IF NOT EXISTS idx_support_tickets_open_created ON support_tickets(created_at DESC) WHERE status IN ('open', 'in_progress');
@@ -0,0 +1,7 @@
+-- Subscriber emails are unique per the app's own checks; enforce it in the
+-- database so subscriber creation can insert with ON CONFLICT DO NOTHING
+-- instead of probing for clashes first. The unique index also serves the
+-- login lookup by email, so the plain index is dropped.
+
+CREATE UNIQUE INDEX IF NOT EXISTS users_email_key ON users(email);
+DROP INDEX IF EXISTS idx_users_email;
@@ -0,0 +1,33 @@
+-- Per-campaign delivery counters read by the CRM campaign metrics endpoint
+-- and upserted by record_campaign_events. marketing_campaigns is created from
+-- the models, so this only applies to databases where it already exists;
+-- elsewhere the models create campaign_stats alongside it.
+
+DO $$
+BEGIN
+    IF to_regclass('marketing_campaigns') IS NOT NULL THEN
+        CREATE TABLE IF NOT EXISTS campaign_stats (
+            campaign_id UUID PRIMARY KEY REFERENCES marketing_campaigns(id) ON DELETE CASCADE,
+            sent BIGINT NOT NULL DEFAULT 0,
+            delivered BIGINT NOT NULL DEFAULT 0,
+            opened BIGINT NOT NULL DEFAULT 0,
+            clicked BIGINT NOT NULL DEFAULT 0,
+            unsubscribed BIGINT NOT NULL DEFAULT 0,
+            bounced BIGINT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        -- Backfill from the counters campaigns already carry in their metrics
+        INSERT INTO campaign_stats (campaign_id, sent, delivered, opened, clicked, unsubscribed, bounced)
+        SELECT id,
+               COALESCE((metrics->>'sent')::BIGINT, 0),
+               COALESCE((metrics->>'delivered')::BIGINT, 0),
+               COALESCE((metrics->>'opened')::BIGINT, 0),
+               COALESCE((metrics->>'clicked')::BIGINT, 0),
+               COALESCE((metrics->>'unsubscribed')::BIGINT, 0),
+               COALESCE((metrics->>'bounced')::BIGINT, 0)
+        FROM marketing_campaigns
+        WHERE metrics ?| ARRAY['sent', 'delivered', 'opened', 'clicked', 'unsubscribed', 'bounced']
+        ON CONFLICT (campaign_id) DO NOTHING;
+    END IF;
+END $$;
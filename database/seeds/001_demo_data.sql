@@ -174,25 +174,25 @@ VALUES
 ('550e8400-e29b-41d4-a716-446655440006', '550e8400-e29b-41d4-a716-446655440006', 'user', 'customer', '{"view_usage": true, "manage_account": true, "create_tickets": true}');
 
 -- Insert some demo bandwidth usage data
-INSERT INTO bandwidth_usage (user_id, date, upload_bytes, download_bytes, total_bytes, peak_usage_mbps)
+INSERT INTO bandwidth_usage (user_id, isp_id, date, upload_bytes, download_bytes, total_bytes, peak_usage_mbps)
 VALUES 
 -- John Doe usage for last 7 days
-('550e8400-e29b-41d4-a716-446655440004', CURRENT_DATE - INTERVAL '6 days', 1073741824, 5368709120, 6442450944, 18), -- 1GB up, 5GB down
-('550e8400-e29b-41d4-a716-446655440004', CURRENT_DATE - INTERVAL '5 days', 1258291200, 6442450944, 7700742144, 22),
-('550e8400-e29b-41d4-a716-446655440004', CURRENT_DATE - INTERVAL '4 days', 805306368, 4294967296, 5100273664, 15),
-('550e8400-e29b-41d4-a716-446655440004', CURRENT_DATE - INTERVAL '3 days', 1610612736, 8589934592, 10200547328, 24),
-('550e8400-e29b-41d4-a716-446655440004', CURRENT_DATE - INTERVAL '2 days', 1342177280, 7516192768, 8858370048, 20),
-('550e8400-e29b-41d4-a716-446655440004', CURRENT_DATE - INTERVAL '1 day', 1073741824, 5368709120, 6442450944, 19),
-('550e8400-e29b-41d4-a716-446655440004', CURRENT_DATE, 536870912, 3221225472, 3758096384, 16),
+('550e8400-e29b-41d4-a716-446655440004', '550e8400-e29b-41d4-a716-446655440001', CURRENT_DATE - INTERVAL '6 days', 1073741824, 5368709120, 6442450944, 18), -- 1GB up, 5GB down
+('550e8400-e29b-41d4-a716-446655440004', '550e8400-e29b-41d4-a716-446655440001', CURRENT_DATE - INTERVAL '5 days', 1258291200, 6442450944, 7700742144, 22),
+('550e8400-e29b-41d4-a716-446655440004', '550e8400-e29b-41d4-a716-446655440001', CURRENT_DATE - INTERVAL '4 days', 805306368, 4294967296, 5100273664, 15),
+('550e8400-e29b-41d4-a716-446655440004', '550e8400-e29b-41d4-a716-446655440001', CURRENT_DATE - INTERVAL '3 days', 1610612736, 8589934592, 10200547328, 24),
+('550e8400-e29b-41d4-a716-446655440004', '550e8400-e29b-41d4-a716-446655440001', CURRENT_DATE - INTERVAL '2 days', 1342177280, 7516192768, 8858370048, 20),
+('550e8400-e29b-41d4-a716-446655440004', '550e8400-e29b-41d4-a716-446655440001', CURRENT_DATE - INTERVAL '1 day', 1073741824, 5368709120, 6442450944, 19),
+('550e8400-e29b-41d4-a716-446655440004', '550e8400-e29b-41d4-a716-446655440001', CURRENT_DATE, 536870912, 3221225472, 3758096384, 16),
 
 -- Jane Smith usage for last 7 days (Premium plan user)
-('550e8400-e29b-41d4-a716-446655440005', CURRENT_DATE - INTERVAL '6 days', 2147483648, 17179869184, 19327352832, 85),
-('550e8400-e29b-41d4-a716-446655440005', CURRENT_DATE - INTERVAL '5 days', 2684354560, 21474836480, 24159191040, 95),
-('550e8400-e29b-41d4-a716-446655440005', CURRENT_DATE - INTERVAL '4 days', 1879048192, 15032385536, 16911433728, 78),
-('550e8400-e29b-41d4-a716-446655440005', CURRENT_DATE - INTERVAL '3 days', 3221225472, 25769803776, 28991029248, 99),
-('550e8400-e29b-41d4-a716-446655440005', CURRENT_DATE - INTERVAL '2 days', 2415919104, 19327352832, 21743271936, 88),
-('550e8400-e29b-41d4-a716-446655440005', CURRENT_DATE - INTERVAL '1 day', 2147483648, 17179869184, 19327352832, 92),
-('550e8400-e29b-41d4-a716-446655440005', CURRENT_DATE, 1610612736, 12884901888, 14495514624, 76);
+('550e8400-e29b-41d4-a716-446655440005', '550e8400-e29b-41d4-a716-446655440001', CURRENT_DATE - INTERVAL '6 days', 2147483648, 17179869184, 19327352832, 85),
+('550e8400-e29b-41d4-a716-446655440005', '550e8400-e29b-41d4-a716-446655440001', CURRENT_DATE - INTERVAL '5 days', 2684354560, 21474836480, 24159191040, 95),
+('550e8400-e29b-41d4-a716-446655440005', '550e8400-e29b-41d4-a716-446655440001', CURRENT_DATE - INTERVAL '4 days', 1879048192, 15032385536, 16911433728, 78),
+('550e8400-e29b-41d4-a716-446655440005', '550e8400-e29b-41d4-a716-446655440001', CURRENT_DATE - INTERVAL '3 days', 3221225472, 25769803776, 28991029248, 99),
+('550e8400-e29b-41d4-a716-446655440005', '550e8400-e29b-41d4-a716-446655440001', CURRENT_DATE - INTERVAL '2 days', 2415919104, 19327352832, 21743271936, 88),
+('550e8400-e29b-41d4-a716-446655440005', '550e8400-e29b-41d4-a716-446655440001', CURRENT_DATE - INTERVAL '1 day', 2147483648, 17179869184, 19327352832, 92),
+('550e8400-e29b-41d4-a716-446655440005', '550e8400-e29b-41d4-a716-446655440001', CURRENT_DATE, 1610612736, 12884901888, 14495514624, 76);
 
 -- Insert demo support ticket
 INSERT INTO support_tickets (id, user_id, title, description, category, priority, status)
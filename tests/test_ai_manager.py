@@ -0,0 +1,24 @@
+import numpy as np
+
+from backend.ai_manager.main import robust_z_scores, ANOMALY_SCORE_THRESHOLD
+
+class TestRobustZScores:
+    def test_spike_in_varied_traffic_is_flagged(self):
+        """A spike well outside the spread is scored above the threshold"""
+        scores = robust_z_scores(np.array([10, 12, 9, 11, 10, 13, 500], dtype=np.float32))
+        
+        assert scores[-1] > ANOMALY_SCORE_THRESHOLD
+        assert (scores[:-1] < ANOMALY_SCORE_THRESHOLD).all()
+
+    def test_spike_in_flat_traffic_is_flagged(self):
+        """MAD is 0 when most samples are equal; the spike must still be flagged"""
+        scores = robust_z_scores(np.array([10, 10, 10, 10, 500], dtype=np.float32))
+        
+        assert scores[-1] > ANOMALY_SCORE_THRESHOLD
+        assert (scores[:-1] == 0).all()
+
+    def test_constant_traffic_scores_zero(self):
+        """Only identical samples yield all-zero scores"""
+        scores = robust_z_scores(np.array([42, 42, 42], dtype=np.float32))
+        
+        assert (scores == 0).all()
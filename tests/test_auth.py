@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from backend.auth import main as auth_main
+from backend.auth.schemas import LoginRequest
+
+class TestSingleFlightLogin:
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_logins_share_one_verification(self, monkeypatch):
+        """Concurrent attempts with the same credentials run _authenticate once"""
+        calls = []
+        
+        async def fake_authenticate(credentials, db):
+            calls.append(credentials.email)
+            await asyncio.sleep(0.05)
+            return {"access_token": "token"}
+        
+        monkeypatch.setattr(auth_main, "_authenticate", fake_authenticate)
+        credentials = LoginRequest(email="admin@demo-isp.com", password="admin123")
+        
+        responses = await asyncio.gather(*[auth_main.login(credentials, db=None) for _ in range(5)])
+        
+        assert len(calls) == 1
+        assert all(response == {"access_token": "token"} for response in responses)
+        assert auth_main._login_inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_different_passwords_are_verified_separately(self, monkeypatch):
+        """Only identical (email, password) pairs are coalesced"""
+        calls = []
+        
+        async def fake_authenticate(credentials, db):
+            calls.append(credentials.password)
+            await asyncio.sleep(0.05)
+            return {"access_token": credentials.password}
+        
+        monkeypatch.setattr(auth_main, "_authenticate", fake_authenticate)
+        
+        await asyncio.gather(
+            auth_main.login(LoginRequest(email="admin@demo-isp.com", password="one"), db=None),
+            auth_main.login(LoginRequest(email="admin@demo-isp.com", password="two"), db=None)
+        )
+        
+        assert sorted(calls) == ["one", "two"]
+
+    @pytest.mark.asyncio
+    async def test_failed_login_is_shared_and_not_cached(self, monkeypatch):
+        """Waiters get the same 401, and the next attempt verifies again"""
+        calls = []
+        
+        async def fake_authenticate(credentials, db):
+            calls.append(credentials.email)
+            await asyncio.sleep(0.05)
+            raise HTTPException(status_code=401, detail="Invalid email or password")
+        
+        monkeypatch.setattr(auth_main, "_authenticate", fake_authenticate)
+        credentials = LoginRequest(email="admin@demo-isp.com", password="wrong")
+        
+        results = await asyncio.gather(
+            *[auth_main.login(credentials, db=None) for _ in range(3)],
+            return_exceptions=True
+        )
+        
+        assert len(calls) == 1
+        assert all(isinstance(result, HTTPException) and result.status_code == 401 for result in results)
+        
+        with pytest.raises(HTTPException):
+            await auth_main.login(credentials, db=None)
+        assert len(calls) == 2
@@ -0,0 +1,31 @@
+from backend.shared.utils.cache import etag_response
+
+class TestETagResponse:
+    def test_body_is_served_with_etag(self):
+        """A first request gets the body, an ETag and a short private max-age"""
+        response = etag_response('{"total_subscribers": 3}', None)
+        
+        assert response.status_code == 200
+        assert response.body == b'{"total_subscribers": 3}'
+        assert response.headers["ETag"].startswith('"')
+        assert response.headers["Cache-Control"] == "private, max-age=30"
+
+    def test_matching_if_none_match_is_not_modified(self):
+        """Sending the ETag back yields an empty 304 that keeps the validator"""
+        body = '{"total_subscribers": 3}'
+        etag = etag_response(body, None).headers["ETag"]
+        
+        response = etag_response(body, etag)
+        
+        assert response.status_code == 304
+        assert response.body == b""
+        assert response.headers["ETag"] == etag
+
+    def test_changed_body_is_served_again(self):
+        """A stale ETag gets the new body and a different ETag"""
+        stale_etag = etag_response('{"total_subscribers": 3}', None).headers["ETag"]
+        
+        response = etag_response('{"total_subscribers": 4}', stale_etag)
+        
+        assert response.status_code == 200
+        assert response.headers["ETag"] != stale_etag
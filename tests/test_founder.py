@@ -0,0 +1,90 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from backend.founder import main as founder_main
+from backend.founder.schemas import ISPCreateRequest
+
+class FakeSession:
+    """Async session stand-in returning queued scalar results and recording statements"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+        self.committed = False
+
+    async def scalar(self, statement):
+        self.statements.append(statement)
+        return self.results.pop(0)
+
+    async def commit(self):
+        self.committed = True
+
+    async def rollback(self):
+        pass
+
+    def inserted_domains(self):
+        return [
+            statement.compile(dialect=postgresql.dialect()).params["domain"]
+            for statement in self.statements[1:]
+        ]
+
+@pytest.fixture
+def isp_data(monkeypatch):
+    # bcrypt is irrelevant to the insert retries
+    monkeypatch.setattr(founder_main, "hash_password", lambda password: "hashed")
+    return ISPCreateRequest(company_name="Acme Net", email="ops@acme.example", password="secret")
+
+class TestCreateISPDomainRetry:
+    @pytest.mark.asyncio
+    async def test_free_domain_is_claimed_first_time(self, isp_data):
+        """No conflict: one ON CONFLICT insert with the plain domain"""
+        isp_id = uuid.uuid4()
+        db = FakeSession(None, isp_id)
+        
+        response = await founder_main.create_isp_portal(isp_data, SimpleNamespace(id=uuid.uuid4()), db)
+        
+        assert db.inserted_domains() == ["acme-net"]
+        assert response.isp_id == str(isp_id)
+        assert response.domain == "acme-net"
+        assert db.committed
+
+    @pytest.mark.asyncio
+    async def test_taken_domain_is_retried_with_suffix(self, isp_data):
+        """DO NOTHING returning no row means the domain is taken; retry with a random suffix"""
+        isp_id = uuid.uuid4()
+        db = FakeSession(None, None, isp_id)
+        
+        response = await founder_main.create_isp_portal(isp_data, SimpleNamespace(id=uuid.uuid4()), db)
+        
+        first, second = db.inserted_domains()
+        assert first == "acme-net"
+        assert second.startswith("acme-net-") and second != first
+        assert response.domain == second
+        assert response.isp_id == str(isp_id)
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_bounded_attempts(self, isp_data):
+        """Every attempt conflicting ends in a 409 without committing"""
+        db = FakeSession(None, *[None] * founder_main.ISP_DOMAIN_ATTEMPTS)
+        
+        with pytest.raises(HTTPException) as exc_info:
+            await founder_main.create_isp_portal(isp_data, SimpleNamespace(id=uuid.uuid4()), db)
+        
+        assert exc_info.value.status_code == 409
+        assert len(db.inserted_domains()) == founder_main.ISP_DOMAIN_ATTEMPTS
+        assert not db.committed
+
+    @pytest.mark.asyncio
+    async def test_registered_email_is_rejected_before_insert(self, isp_data):
+        """The email pre-check short-circuits before any insert"""
+        db = FakeSession(uuid.uuid4())
+        
+        with pytest.raises(HTTPException) as exc_info:
+            await founder_main.create_isp_portal(isp_data, SimpleNamespace(id=uuid.uuid4()), db)
+        
+        assert exc_info.value.status_code == 400
+        assert db.inserted_domains() == []
@@ -0,0 +1,36 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy.dialects import postgresql
+
+from backend.isp.main import subscriber_list_statement
+from backend.shared.utils.pagination import encode_cursor
+
+def compile_statement(statement):
+    return statement.compile(dialect=postgresql.dialect())
+
+class TestSubscriberListStatement:
+    def test_cursor_continues_after_created_at_and_id(self):
+        """The page resumes strictly after the cursor's (created_at, id), so ties are not skipped"""
+        created_at, row_id = datetime(2024, 3, 1), uuid.uuid4()
+        
+        compiled = compile_statement(subscriber_list_statement(uuid.uuid4(), None, encode_cursor(created_at, row_id), 50))
+        sql = str(compiled)
+        
+        assert "(users.created_at, users.id) < (" in sql
+        assert created_at in compiled.params.values()
+        assert row_id in compiled.params.values()
+        assert "ORDER BY users.created_at DESC, users.id DESC" in sql
+
+    def test_limited_page_fetches_one_extra_row(self):
+        """limit + 1 rows are fetched so split_page can tell whether another page follows"""
+        compiled = compile_statement(subscriber_list_statement(uuid.uuid4(), None, None, 50))
+        
+        assert "users.created_at, users.id) <" not in str(compiled)
+        assert 51 in compiled.params.values()
+
+    def test_unlimited_list_is_not_cut(self):
+        """Without a limit only the per-user latest usage/payment lookups are limited"""
+        sql = str(compile_statement(subscriber_list_statement(uuid.uuid4(), None, None, None)))
+        
+        assert sql.count("LIMIT") == 2
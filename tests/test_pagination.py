@@ -0,0 +1,49 @@
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from backend.shared.utils.pagination import encode_cursor, decode_cursor, split_page
+
+class TestKeysetCursor:
+    def test_cursor_round_trip(self):
+        """A cursor decodes back to the (created_at, id) it was built from"""
+        created_at = datetime(2024, 3, 1, 12, 30, 15, 123456)
+        row_id = uuid.uuid4()
+        
+        assert decode_cursor(encode_cursor(created_at, row_id)) == (created_at, row_id)
+
+    def test_cursor_is_opaque(self):
+        """The cursor does not expose the raw timestamp or id"""
+        row_id = uuid.uuid4()
+        cursor = encode_cursor(datetime(2024, 3, 1), row_id)
+        
+        assert str(row_id) not in cursor
+        assert "|" not in cursor
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", "", encode_cursor(datetime(2024, 3, 1), "x")])
+    def test_malformed_cursor_is_rejected(self, cursor):
+        """A cursor that does not decode is a 400, not a 500"""
+        with pytest.raises(HTTPException) as exc_info:
+            decode_cursor(cursor)
+        
+        assert exc_info.value.status_code == 400
+
+class TestSplitPage:
+    def test_extra_row_is_trimmed_and_yields_cursor(self):
+        """limit + 1 rows: the page is cut to limit and the cursor points at its last row"""
+        rows = [SimpleNamespace(created_at=datetime(2024, 3, 1), id=uuid.uuid4()) for _ in range(4)]
+        
+        page, cursor = split_page(rows, 3)
+        
+        assert page == rows[:3]
+        assert decode_cursor(cursor) == (rows[2].created_at, rows[2].id)
+
+    def test_last_page_has_no_cursor(self):
+        """Up to limit rows means no further page"""
+        rows = [SimpleNamespace(created_at=datetime(2024, 3, 1), id=uuid.uuid4()) for _ in range(3)]
+        
+        assert split_page(rows, 3) == (rows, None)
+        assert split_page(rows, None) == (rows, None)